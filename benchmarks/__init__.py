@@ -0,0 +1,20 @@
+from typing import Any, AsyncContextManager, Awaitable, Callable
+
+Operation = Callable[[], Any] | Callable[[], Awaitable[Any]]
+BenchmarkFactory = Callable[[], AsyncContextManager[list[tuple[str, Operation]]]]
+registry: list[BenchmarkFactory] = []
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose dependencies are unavailable"""
+
+
+def benchmark(factory: BenchmarkFactory) -> BenchmarkFactory:
+    """Register an async context manager yielding (name, operation) pairs
+
+    Setup happens before the yield (raise Skip when a dependency is
+    unavailable) and cleanup after it. Operations are timed one call at
+    a time.
+    """
+    registry.append(factory)
+    return factory
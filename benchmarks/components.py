@@ -0,0 +1,203 @@
+"""Benchmarks of the API's hot components, each measured in isolation"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from litestar.security.jwt import Token
+
+from app.api.schemas.file import FileInfo, FileListResponse
+from app.auth.jwt import jwt_auth
+from app.config import settings
+from app.services.password_service import password_service
+from benchmarks import Skip, benchmark
+
+_SERVICE_TIMEOUT_SECONDS = 3
+_SEEDED_FILES = 1000
+
+
+@benchmark
+@asynccontextmanager
+async def passwords():
+    hashed = password_service.hash_password("benchmark-password")
+    yield [
+        ("password.hash", lambda: password_service.hash_password("benchmark-password")),
+        (
+            "password.verify",
+            lambda: password_service.verify_password("benchmark-password", hashed),
+        ),
+    ]
+
+
+@benchmark
+@asynccontextmanager
+async def jwt_tokens():
+    identifier = str(uuid.uuid4())
+    encoded = jwt_auth.create_token(identifier=identifier)
+    yield [
+        ("jwt.encode", lambda: jwt_auth.create_token(identifier=identifier)),
+        (
+            "jwt.decode",
+            lambda: Token.decode(encoded, jwt_auth.token_secret, jwt_auth.algorithm),
+        ),
+    ]
+
+
+@benchmark
+@asynccontextmanager
+async def s3_presign():
+    # Presigning is local request signing; no S3 round trip is made
+    from app.services.s3_service import s3_service
+
+    user_id = str(uuid.uuid4())
+    yield [
+        (
+            "s3.presign_upload",
+            lambda: s3_service.generate_presigned_upload_url(
+                file_id=str(uuid.uuid4()),
+                user_id=user_id,
+                original_filename="readings.csv",
+                content_type="text/csv",
+                expires_in=60,
+            ),
+        ),
+        (
+            "s3.presign_download",
+            lambda: s3_service.generate_presigned_url(
+                f"users/{user_id}/readings.csv", expires_in=60
+            ),
+        ),
+    ]
+
+
+def _file_rows(count: int) -> list[dict]:
+    user_id = str(uuid.uuid4())
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "filename": f"readings_{i}.csv",
+            "original_filename": f"readings_{i}.csv",
+            "content_type": "text/csv",
+            "file_size": 1024 * i,
+            "upload_date": datetime(2025, 1, 1),
+            "uploaded_by": user_id,
+        }
+        for i in range(count)
+    ]
+
+
+@benchmark
+@asynccontextmanager
+async def file_listing_schemas():
+    operations = []
+    for count, label in ((1000, "1k"), (10000, "10k")):
+        rows = _file_rows(count)
+        response = FileListResponse(
+            files=[FileInfo(**row) for row in rows], total_count=count
+        )
+        operations += [
+            (
+                f"schema.file_info.build.{label}",
+                lambda rows=rows: [FileInfo(**row) for row in rows],
+            ),
+            (
+                f"schema.file_list.dump_json.{label}",
+                lambda response=response: response.model_dump_json(),
+            ),
+        ]
+    yield operations
+
+
+@benchmark
+@asynccontextmanager
+async def user_files_query():
+    from litestar.plugins.sqlalchemy import base
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.db.models.file import FileModel, UploadStatus
+    from app.db.models.user import UserModel
+    from app.db.repositories.file import FileRepository
+
+    engine = create_async_engine(str(settings.database.url))
+    try:
+        connection = await asyncio.wait_for(engine.connect(), _SERVICE_TIMEOUT_SECONDS)
+    except Exception as e:
+        await engine.dispose()
+        raise Skip(f"Postgres unavailable: {e}")
+
+    # Everything is seeded inside one transaction that is rolled back
+    transaction = await connection.begin()
+    try:
+        await connection.run_sync(base.orm_registry.metadata.create_all)
+        session = AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+        user = UserModel(
+            name="benchmark",
+            email=f"benchmark-{uuid.uuid4().hex}@example.com",
+            password="-",
+        )
+        session.add(user)
+        await session.flush()
+        user_id = user.id
+        session.add_all(
+            FileModel(
+                filename=f"readings_{i}.csv",
+                original_filename=f"readings_{i}.csv",
+                content_type="text/csv",
+                file_size=1024 * i,
+                s3_key=f"users/{user_id}/{i}.csv",
+                s3_bucket=settings.s3.bucket_name,
+                uploaded_by=user_id,
+                upload_status=UploadStatus.COMPLETED,
+            )
+            for i in range(_SEEDED_FILES)
+        )
+        await session.flush()
+        session.expunge_all()
+        repo = FileRepository(session=session)
+
+        async def get_user_files():
+            await repo.get_user_files(session, user_id)
+            # Measure full row loading, not identity map hits
+            session.expunge_all()
+
+        yield [("db.get_user_files.1k", get_user_files)]
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+@benchmark
+@asynccontextmanager
+async def refresh_tokens():
+    from app.services.redis_token_service import RedisTokenService
+
+    service = RedisTokenService()
+    await service._connect()
+    try:
+        await asyncio.wait_for(service.redis.ping(), _SERVICE_TIMEOUT_SECONDS)
+    except Exception as e:
+        await service.disconnect()
+        raise Skip(f"Redis unavailable: {e}")
+
+    user_id = uuid.uuid4()
+    created = [await service.create_refresh_token(user_id)]
+
+    async def create():
+        created.append(await service.create_refresh_token(user_id))
+
+    async def validate():
+        await service.validate_refresh_token(created[0])
+
+    try:
+        yield [("redis.token.create", create), ("redis.token.validate", validate)]
+    finally:
+        keys = [f"{service.prefix}{token}" for token in created]
+        for start in range(0, len(keys), 1000):
+            await service.redis.delete(*keys[start : start + 1000])
+        await service.disconnect()
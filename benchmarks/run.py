@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Component micro-benchmarks with regression budgets
+
+Run from the repository root with the usual environment (.env) loaded:
+
+    uv run python -m benchmarks.run                    # compare with baseline
+    uv run python -m benchmarks.run --update-baseline  # record a new baseline
+    uv run python -m benchmarks.run -k password -k jwt
+
+Benchmarks needing Postgres or Redis are skipped when those are not
+reachable. Baselines are machine specific: record them on the machine
+(or CI runner) that later compares against them. Comparing fails when the
+baseline, or the entry of a benchmark that ran, is missing.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks import Operation, Skip, registry
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25
+# Each timed round is grown until it takes at least this long
+_MIN_ROUND_SECONDS = 0.2
+_ROUNDS = 5
+
+
+@dataclass
+class Result:
+    name: str
+    median_s: float
+    min_s: float
+    number: int
+    rounds: int
+
+    def to_dict(self) -> dict:
+        return {
+            "median_s": self.median_s,
+            "min_s": self.min_s,
+            "ops_per_s": 1 / self.median_s if self.median_s else None,
+            "number": self.number,
+            "rounds": self.rounds,
+        }
+
+
+async def _time_round(operation: Operation, number: int) -> float:
+    if inspect.iscoroutinefunction(operation):
+        start = time.perf_counter()
+        for _ in range(number):
+            await operation()
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(number):
+        operation()
+    return time.perf_counter() - start
+
+
+async def measure(name: str, operation: Operation) -> Result:
+    # Warm up, then calibrate the number of calls per round like timeit
+    await _time_round(operation, 1)
+    number = 1
+    while (elapsed := await _time_round(operation, number)) < _MIN_ROUND_SECONDS:
+        number = max(number * 2, int(number * _MIN_ROUND_SECONDS / max(elapsed, 1e-9)))
+    per_op = [elapsed / number]
+    for _ in range(_ROUNDS - 1):
+        per_op.append(await _time_round(operation, number) / number)
+    return Result(name, statistics.median(per_op), min(per_op), number, _ROUNDS)
+
+
+def compare(
+    results: dict[str, Result], baseline: dict, default_threshold: float
+) -> list[str]:
+    """Names of benchmarks slower than their baseline beyond the threshold"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            continue
+        threshold = reference.get("threshold", default_threshold)
+        if result.median_s > reference["median_s"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+async def run(patterns: list[str]) -> dict[str, Result]:
+    # Importing the definitions fills the registry
+    from benchmarks import components  # noqa: F401
+
+    results = {}
+    for factory in registry:
+        try:
+            async with factory() as operations:
+                for name, operation in operations:
+                    if patterns and not any(p in name for p in patterns):
+                        continue
+                    results[name] = await measure(name, operation)
+        except Skip as e:
+            print(f"⏭️  {factory.__name__}: skipped ({e})")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-k", dest="patterns", action="append", default=[])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # Without a baseline there is nothing to compare against; passing would
+    # hide every regression
+    if not args.update_baseline and not args.baseline.exists():
+        print(
+            f"❌ No baseline at {args.baseline}; record one on this machine "
+            "with --update-baseline"
+        )
+        return 1
+
+    results = asyncio.run(run(args.patterns))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+
+    print(
+        f"\n{'benchmark':<36}{'median':>12}{'ops/s':>12}{'baseline':>12}{'change':>9}"
+    )
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        change = ""
+        reference_text = "-"
+        if reference:
+            reference_text = f"{reference['median_s'] * 1e6:.1f}µs"
+            change = f"{result.median_s / reference['median_s'] - 1:+.0%}"
+        print(
+            f"{name:<36}{result.median_s * 1e6:>10.1f}µs"
+            f"{1 / result.median_s:>12.0f}{reference_text:>12}{change:>9}"
+        )
+
+    if args.update_baseline:
+        previous = baseline.get("results", {})
+        merged = {**previous}
+        for name, result in results.items():
+            entry = result.to_dict()
+            # Keep per-benchmark thresholds configured by hand
+            if "threshold" in previous.get(name, {}):
+                entry["threshold"] = previous[name]["threshold"]
+            merged[name] = entry
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "results": merged,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return 0
+
+    missing = [name for name in results if name not in baseline.get("results", {})]
+    if missing:
+        print(f"\n❌ Not in the baseline: {', '.join(missing)}")
+        return 1
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ Regressed beyond threshold: {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Cold start budget: time to import the app and build it in a fresh process
+
+Run from the repository root with the usual environment (.env) loaded:
+
+    uv run python -m benchmarks.startup               # default budget
+    uv run python -m benchmarks.startup --budget 0.8
+
+Exits non-zero when the median cold start exceeds the budget and lists the
+slowest imports, so it can gate CI. Like the benchmark baselines, budgets
+are machine specific; pass the one measured on the machine that checks it. Nothing here connects to Postgres,
+Redis or S3: building the app must not need them.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+DEFAULT_BUDGET_SECONDS = 2.0
+_RUNS = 5
+_SLOWEST_IMPORTS = 15
+
+_MEASURE = """
+import json, time
+start = time.perf_counter()
+from app.app_factory import create_app
+imported = time.perf_counter()
+create_app()
+built = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "create_app_s": built - imported}))
+"""
+
+
+def _cold_start() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _slowest_imports(limit: int) -> list[tuple[int, str]]:
+    """Top-level app modules and third-party packages by cumulative import time"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.app_factory"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings.append((int(cumulative), name.rstrip()))
+    # Keep modules at most one level deep in the import tree
+    shallow = [
+        (us, name.strip())
+        for us, name in timings
+        if len(name) - len(name.lstrip()) <= 5
+    ]
+    return sorted(shallow, reverse=True)[:limit]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    parser.add_argument("--runs", type=int, default=_RUNS)
+    args = parser.parse_args()
+
+    # The first run also warms the bytecode and filesystem caches
+    _cold_start()
+    runs = [_cold_start() for _ in range(args.runs)]
+    imports = statistics.median(run["import_s"] for run in runs)
+    builds = statistics.median(run["create_app_s"] for run in runs)
+    total = statistics.median(run["import_s"] + run["create_app_s"] for run in runs)
+
+    print(f"{'import app.app_factory':<28}{imports * 1000:>10.0f}ms")
+    print(f"{'create_app()':<28}{builds * 1000:>10.0f}ms")
+    print(f"{'total (median)':<28}{total * 1000:>10.0f}ms")
+    print(f"{'budget':<28}{args.budget * 1000:>10.0f}ms")
+
+    if total > args.budget:
+        print("\nSlowest imports:")
+        for microseconds, name in _slowest_imports(_SLOWEST_IMPORTS):
+            print(f"  {microseconds / 1000:>8.0f}ms  {name}")
+        print(f"\n❌ Cold start over budget by {(total - args.budget) * 1000:.0f}ms")
+        return 1
+    print("\n✅ Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Load generator - N virtual devices running a mix of API flows
+
+Scenarios arrive open-loop (Poisson arrivals at a fixed rate per stage),
+independent of how fast the server answers, so queueing shows up as
+latency instead of silently lowering the offered load. Latency is
+reported per step with p50/p95/p99.
+
+Against the local stack (docker compose up: Postgres, Redis, MinIO, app):
+
+    uv run python load_test.py --devices 50 --stages 5:60,20:60,50:60
+
+Since MinIO does not call the upload webhook, the tool posts the S3 event
+itself after each upload (--no-simulate-webhook against real S3). Login and
+sign-up are rate limited per IP; set RATE_LIMIT_ENABLED=false on the app
+when creating many devices from one machine.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+DEFAULT_MIX = "upload=4,list=4,refresh=1,delete=1"
+
+
+@dataclass
+class Device:
+    email: str
+    password: str
+    access_token: str = ""
+    refresh_token: str = ""
+    file_ids: list[str] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+@dataclass
+class Stage:
+    rate: float
+    duration: float
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.scenarios: dict[str, int] = defaultdict(int)
+        self.scenario_errors: dict[str, int] = defaultdict(int)
+        self.dropped = 0
+
+    def record(self, step: str, seconds: float) -> None:
+        self.latencies[step].append(seconds)
+
+    def report(self, label: str, elapsed: float) -> dict:
+        steps = {}
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(step, []))
+            steps[step] = {
+                "count": len(values),
+                "errors": self.errors.get(step, 0),
+                "throughput": len(values) / elapsed if elapsed else 0.0,
+                "p50_ms": _percentile(values, 50) * 1000,
+                "p95_ms": _percentile(values, 95) * 1000,
+                "p99_ms": _percentile(values, 99) * 1000,
+                "mean_ms": statistics.fmean(values) * 1000 if values else 0.0,
+            }
+
+        print(f"\n📊 {label} ({elapsed:.0f}s)")
+        print(
+            f"   {'step':<16}{'ok':>8}{'err':>6}{'req/s':>9}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for step, row in steps.items():
+            print(
+                f"   {step:<16}{row['count']:>8}{row['errors']:>6}"
+                f"{row['throughput']:>9.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            )
+        completed = sum(self.scenarios.values())
+        failed = sum(self.scenario_errors.values())
+        print(
+            f"   scenarios: {completed} ok, {failed} failed, "
+            f"{completed / elapsed if elapsed else 0:.1f}/s, "
+            f"{self.dropped} dropped (too many in flight)"
+        )
+        return {
+            "elapsed_s": elapsed,
+            "steps": steps,
+            "scenarios": dict(self.scenarios),
+            "scenario_errors": dict(self.scenario_errors),
+            "dropped": self.dropped,
+        }
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.api = httpx.AsyncClient(
+            base_url=args.base_url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.max_connections),
+        )
+        # Uploads and downloads go straight to S3, like a real device
+        self.storage = httpx.AsyncClient(
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.max_connections),
+        )
+        self.payload = _csv_payload(args.file_size)
+        self.stats = Stats()
+        self.mix = _parse_mix(args.mix)
+        self.devices: list[Device] = []
+
+    async def step(self, name: str, request) -> httpx.Response:
+        """Time one request; non-2xx responses count as errors"""
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            self.stats.errors[name] += 1
+            raise StepFailed(f"{name}: {e!r}")
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            self.stats.errors[name] += 1
+            raise StepFailed(f"{name}: HTTP {response.status_code}")
+        self.stats.record(name, elapsed)
+        return response
+
+    # Setup
+
+    async def _with_retry_after(self, send) -> httpx.Response:
+        while True:
+            response = await send()
+            if response.status_code != 429:
+                return response
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+    async def create_device(self, index: int, run_id: str) -> Device:
+        device = Device(
+            email=f"loadtest-{run_id}-{index}@example.com",
+            password=uuid.uuid4().hex,
+        )
+        response = await self._with_retry_after(
+            lambda: self.api.post(
+                "/users/",
+                json={
+                    "name": f"device-{index}",
+                    "email": device.email,
+                    "password": device.password,
+                },
+            )
+        )
+        response.raise_for_status()
+        response = await self._with_retry_after(
+            lambda: self.api.post(
+                "/auth/login",
+                json={"email": device.email, "password": device.password},
+            )
+        )
+        response.raise_for_status()
+        tokens = response.json()
+        device.access_token = tokens["access_token"]
+        device.refresh_token = tokens["refresh_token"]
+        return device
+
+    async def setup(self) -> None:
+        run_id = uuid.uuid4().hex[:8]
+        print(f"🔐 Creating {self.args.devices} devices...")
+        semaphore = asyncio.Semaphore(10)
+
+        async def create(index: int) -> Device:
+            async with semaphore:
+                return await self.create_device(index, run_id)
+
+        self.devices = await asyncio.gather(
+            *(create(i) for i in range(self.args.devices))
+        )
+
+    # Scenarios
+
+    async def upload(self, device: Device) -> None:
+        filename = f"readings-{uuid.uuid4().hex[:8]}.csv"
+        response = await self.step(
+            "presign",
+            self.api.post(
+                "/files/upload/presigned",
+                json={
+                    "filename": filename,
+                    "content_type": "text/csv",
+                    "file_size": len(self.payload),
+                },
+                headers=device.headers,
+            ),
+        )
+        presigned = response.json()
+
+        await self.step(
+            "s3_put",
+            self.storage.put(
+                presigned["upload_url"],
+                content=self.payload,
+                headers={
+                    "Content-Type": "text/csv",
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                },
+            ),
+        )
+
+        if self.args.simulate_webhook:
+            await self.step(
+                "webhook",
+                self.api.post(
+                    "/files/webhook/s3-upload",
+                    json=[
+                        {
+                            "eventSource": "aws:s3",
+                            "eventName": "ObjectCreated:Put",
+                            "s3": {
+                                "object": {
+                                    "key": presigned["s3_key"],
+                                    "size": len(self.payload),
+                                }
+                            },
+                        }
+                    ],
+                ),
+            )
+
+        device.file_ids.append(presigned["file_id"])
+        response = await self.step(
+            "download_url",
+            self.api.get(
+                f"/files/{presigned['file_id']}/download", headers=device.headers
+            ),
+        )
+        await self.step("s3_get", self.storage.get(response.json()["download_url"]))
+
+    async def list_files(self, device: Device) -> None:
+        await self.step("list", self.api.get("/files/", headers=device.headers))
+
+    async def refresh(self, device: Device) -> None:
+        response = await self.step(
+            "refresh",
+            self.api.post(
+                "/auth/refresh",
+                json={"refresh_token": device.refresh_token},
+                headers=device.headers,
+            ),
+        )
+        device.access_token = response.json()["access_token"]
+
+    async def delete(self, device: Device) -> None:
+        if not device.file_ids:
+            # Nothing uploaded yet; a listing keeps the request mix comparable
+            await self.list_files(device)
+            return
+        file_id = device.file_ids.pop(random.randrange(len(device.file_ids)))
+        await self.step(
+            "delete", self.api.delete(f"/files/{file_id}", headers=device.headers)
+        )
+
+    async def run_scenario(self, name: str, in_flight: asyncio.Semaphore) -> None:
+        device = random.choice(self.devices)
+        try:
+            await getattr(self, _SCENARIOS[name])(device)
+            self.stats.scenarios[name] += 1
+        except StepFailed as e:
+            self.stats.scenario_errors[name] += 1
+            if self.args.verbose:
+                print(f"   ⚠️  {name}: {e}")
+        finally:
+            in_flight.release()
+
+    async def run_stage(self, stage: Stage) -> None:
+        """Open-loop arrivals: exponential inter-arrival times at `stage.rate`"""
+        names, weights = zip(*self.mix.items())
+        in_flight = asyncio.Semaphore(self.args.max_in_flight)
+        tasks = set()
+        deadline = time.perf_counter() + stage.duration
+        next_arrival = time.perf_counter()
+        while True:
+            next_arrival += random.expovariate(stage.rate)
+            if next_arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            if in_flight.locked():
+                self.stats.dropped += 1
+                continue
+            await in_flight.acquire()
+            name = random.choices(names, weights)[0]
+            task = asyncio.create_task(self.run_scenario(name, in_flight))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run(self) -> list[dict]:
+        await self.setup()
+        reports = []
+        try:
+            for index, stage in enumerate(_parse_stages(self.args.stages), 1):
+                print(
+                    f"\n🚀 Stage {index}: {stage.rate:g} scenarios/s for {stage.duration:g}s"
+                )
+                self.stats = Stats()
+                start = time.perf_counter()
+                await self.run_stage(stage)
+                label = f"Stage {index} @ {stage.rate:g}/s"
+                report = self.stats.report(label, time.perf_counter() - start)
+                reports.append({"rate": stage.rate, **report})
+        finally:
+            await self.api.aclose()
+            await self.storage.aclose()
+        return reports
+
+
+_SCENARIOS = {
+    "upload": "upload",
+    "list": "list_files",
+    "refresh": "refresh",
+    "delete": "delete",
+}
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in _SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; use {', '.join(_SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _parse_stages(value: str) -> list[Stage]:
+    stages = []
+    for part in value.split(","):
+        rate, _, duration = part.partition(":")
+        stages.append(Stage(float(rate), float(duration or 60)))
+    return stages
+
+
+def _csv_payload(size: int) -> bytes:
+    lines = ["timestamp,heart_rate,spo2,skin_temp"]
+    base = 1_700_000_000_000
+    total = len(lines[0]) + 1
+    row = 0
+    while total < size:
+        line = (
+            f"{base + row * 1000},{random.randint(55, 120)},"
+            f"{random.randint(90, 100)},{random.uniform(31, 36):.2f}"
+        )
+        lines.append(line)
+        total += len(line) + 1
+        row += 1
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument(
+        "--stages",
+        default="5:60",
+        help="Comma separated RATE:SECONDS stages, e.g. 5:60,20:60",
+    )
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})"
+    )
+    parser.add_argument("--file-size", type=int, default=256 * 1024)
+    parser.add_argument(
+        "--simulate-webhook", action=argparse.BooleanOptionalAction, default=True
+    )
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    reports = asyncio.run(LoadTest(args).run())
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2))
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
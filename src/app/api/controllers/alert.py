@@ -0,0 +1,154 @@
+from uuid import UUID
+from litestar import Controller, Request, get, post, patch, delete
+from litestar.di import Provide
+from litestar.exceptions import ClientException, NotFoundException
+from litestar.params import Parameter
+from litestar.security.jwt import Token
+from app.api.schemas.alert import (
+    AlertEvent,
+    AlertEventListResponse,
+    AlertRule,
+    AlertRuleCreate,
+    AlertRuleUpdate,
+)
+from app.config import settings
+from app.db.models.alert import AlertEventModel, AlertRuleModel
+from app.db.replicas import provide_replica_session
+from app.db.repositories.alert import (
+    AlertEventRepository,
+    AlertRuleRepository,
+    provide_alert_rules_repo,
+    provide_replica_alert_events_repo,
+)
+from app.auth.jwt import AuthUser
+from typing import Annotated, Any
+from datetime import datetime, timezone
+
+
+class AlertController(Controller):
+    """Alert rules, evaluated when an uploaded file is processed, and their events"""
+
+    path = "/alerts"
+    dependencies = {
+        "alert_rules_repo": Provide(provide_alert_rules_repo),
+        "replica_session": Provide(provide_replica_session),
+        "replica_alert_events_repo": Provide(provide_replica_alert_events_repo),
+    }
+    tags = ["alerts"]
+
+    @get("/rules")
+    async def get_rules(
+        self,
+        request: Request[AuthUser, Token, Any],
+        alert_rules_repo: AlertRuleRepository,
+    ) -> list[AlertRule]:
+        rules = await alert_rules_repo.get_user_rules(
+            alert_rules_repo.session, request.user.id
+        )
+        return [_to_rule(rule) for rule in rules]
+
+    @post("/rules")
+    async def create_rule(
+        self,
+        request: Request[AuthUser, Token, Any],
+        alert_rules_repo: AlertRuleRepository,
+        data: AlertRuleCreate,
+    ) -> AlertRule:
+        """Rules apply to files processed after they are created"""
+        user_id = request.user.id
+        count = await alert_rules_repo.count_user_rules(
+            alert_rules_repo.session, user_id
+        )
+        if count >= settings.alert.max_rules_per_user:
+            raise ClientException("Alert rule limit reached")
+
+        rule = AlertRuleModel(user_id=user_id, **data.model_dump())
+        await alert_rules_repo.add(rule, auto_commit=True)
+        return _to_rule(rule)
+
+    @patch("/rules/{rule_id:uuid}")
+    async def update_rule(
+        self,
+        request: Request[AuthUser, Token, Any],
+        alert_rules_repo: AlertRuleRepository,
+        rule_id: UUID,
+        data: AlertRuleUpdate,
+    ) -> AlertRule:
+        rule = await alert_rules_repo.get_one_or_none(
+            AlertRuleModel.id == rule_id, AlertRuleModel.user_id == request.user.id
+        )
+        if not rule:
+            raise NotFoundException("Alert rule not found")
+        for field, value in data.model_dump(exclude_none=True).items():
+            setattr(rule, field, value)
+        await alert_rules_repo.update(rule, auto_commit=True)
+        return _to_rule(rule)
+
+    @delete("/rules/{rule_id:uuid}")
+    async def delete_rule(
+        self,
+        request: Request[AuthUser, Token, Any],
+        alert_rules_repo: AlertRuleRepository,
+        rule_id: UUID,
+    ) -> None:
+        """Delete the rule together with its events"""
+        rule = await alert_rules_repo.get_one_or_none(
+            AlertRuleModel.id == rule_id, AlertRuleModel.user_id == request.user.id
+        )
+        if not rule:
+            raise NotFoundException("Alert rule not found")
+        await alert_rules_repo.delete(rule.id, auto_commit=True)
+
+    @get("/events")
+    async def get_events(
+        self,
+        request: Request[AuthUser, Token, Any],
+        replica_alert_events_repo: AlertEventRepository,
+        rule_id: UUID | None = None,
+        file_id: UUID | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: Annotated[int, Parameter(ge=1, le=1000)] = 100,
+    ) -> AlertEventListResponse:
+        """Detected windows overlapping [since, until), latest first"""
+        events = await replica_alert_events_repo.list_user_events(
+            replica_alert_events_repo.session,
+            request.user.id,
+            rule_id=rule_id,
+            file_id=file_id,
+            since=_as_utc(since) if since else None,
+            until=_as_utc(until) if until else None,
+            limit=limit,
+        )
+        return AlertEventListResponse(
+            events=[_to_event(event) for event in events], total_count=len(events)
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _to_rule(rule: AlertRuleModel) -> AlertRule:
+    return AlertRule(
+        id=str(rule.id),
+        name=rule.name,
+        metric=rule.metric,
+        operator=rule.operator,
+        threshold=rule.threshold,
+        min_duration_seconds=rule.min_duration_seconds,
+        is_enabled=rule.is_enabled,
+    )
+
+
+def _to_event(event: AlertEventModel) -> AlertEvent:
+    return AlertEvent(
+        id=str(event.id),
+        rule_id=str(event.rule_id),
+        file_id=str(event.file_id),
+        start_time=event.start_time,
+        end_time=event.end_time,
+        duration_seconds=event.duration_seconds,
+        sample_count=event.sample_count,
+        peak_value=event.peak_value,
+    )
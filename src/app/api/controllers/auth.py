@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from app.db.models.user import UserModel
-from litestar import Controller, Response, post
+from litestar import Controller, Request, Response, post
 from litestar.di import Provide
 from litestar.exceptions import HTTPException, NotAuthorizedException
 from app.api.schemas.auth import (
@@ -11,6 +11,7 @@ from app.api.schemas.auth import (
 )
 from app.db.repositories.user import UserRepository, provide_users_repo
 from app.auth.jwt import jwt_auth, generate_refresh_token, validate_refresh_token
+from app.services.rate_limit_service import rate_limit_service
 
 
 class AuthController(Controller):
@@ -20,13 +21,17 @@ class AuthController(Controller):
 
     @post("/login", exclude_from_auth=True)
     async def login(
-        self, users_repo: UserRepository, data: LoginRequest
+        self, request: Request, users_repo: UserRepository, data: LoginRequest
     ) -> Response[TokenResponse]:
         """Login API that generates 30 minute access token and 1 hour refresh token"""
+        # Throttle before any bcrypt work is done
+        client_ip = request.client.host if request.client else None
+        await rate_limit_service.check("login", client_ip, data.email)
+
         user = await users_repo.get_one_or_none(UserModel.email == data.email)
         if not user:
             raise NotAuthorizedException(status_code=401, detail="Invalid credentials")
-        if not user.verify_password(data.password):
+        if not await user.verify_password_async(data.password):
             raise NotAuthorizedException(status_code=401, detail="Invalid credentials")
         try:
             access_token_expires = datetime.utcnow() + timedelta(minutes=30)
@@ -1,70 +1,266 @@
+import base64
+import hashlib
+import json
+import logging
 import uuid
-from litestar import Controller, Request, post, get, delete
+from dataclasses import asdict
+from litestar import Controller, Request, Response, post, get, delete
+from litestar.background_tasks import BackgroundTask
+from litestar.response import ServerSentEvent, ServerSentEventMessage, Stream
 from litestar.di import Provide
+from litestar.params import Parameter
 from litestar.exceptions import (
+    ClientException,
+    HTTPException,
     NotFoundException,
     InternalServerException,
     PermissionDeniedException,
 )
 from litestar.security.jwt import Token
 from app.db.models.file import FileModel, UploadStatus
+from app.api.http_caching import (
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
 from app.api.schemas.file import (
+    FileAlignRequest,
+    FileAlignResponse,
+    FileBulkDeleteRequest,
+    FileBulkDeleteResponse,
     FileInfo,
     FileListResponse,
     FileDownloadResponse,
     FileDeleteResponse,
+    FileExportJobResponse,
+    FilePreviewResponse,
+    FileStatsResponse,
     PresignedUploadRequest,
     PresignedUploadResponse,
     S3WebhookEvent,
 )
-from app.db.repositories.file import FileRepository, provide_files_repo
+from app.db.replicas import provide_replica_session, replica_router
+from app.db.repositories.file import (
+    FileListFilters,
+    FileRepository,
+    provide_files_repo,
+    provide_replica_files_repo,
+)
+from app.db.repositories.user import UserRepository, provide_users_repo
+from app.db.repositories.alert import AlertEventRepository
 from app.services.s3_service import s3_service
+from app.services.csv_utils import is_csv_file
+from app.services.file_preview_service import PREVIEW_MAX_ROWS, file_preview_service
+from app.services.file_processing_service import file_processing_service
+from app.services.time_alignment_service import time_alignment_service
+from app.services.readings_cache_service import readings_cache_service
+from app.services.file_listing_cache_service import file_listing_cache_service
+from app.services.storage_quota_service import storage_quota_service
+from app.services.upload_events_service import stream_id_key, upload_events_service
+from app.services.file_export_service import (
+    ExportEntry,
+    ExportJobStatus,
+    file_export_service,
+)
 from app.auth.jwt import AuthUser
-from typing import Any
-from datetime import datetime, timedelta
+from app.observability.propagation import upload_trace_context_store
+from app.observability.tracing import SpanContext, tracer
+from typing import Annotated, Any, AsyncIterator
+from datetime import datetime, timedelta, timezone
+import asyncio
+
+logger = logging.getLogger(__name__)
 
 _PRESIGNED_URL_EXPIRY_SECONDS = 60
+_SSE_HEARTBEAT_SECONDS = 15
+_SSE_RETRY_MILLISECONDS = 3000
+_MAX_PAGE_SIZE = 1000
+
+
+def _as_naive_utc(value: datetime | None) -> datetime | None:
+    """Upload dates are stored as naive UTC"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _encode_cursor(upload_date: datetime, file_id: uuid.UUID) -> str:
+    raw = f"{upload_date.isoformat()}|{file_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        upload_date, file_id = raw.split("|")
+        return datetime.fromisoformat(upload_date), uuid.UUID(file_id)
+    except ValueError:
+        raise ClientException(detail="Invalid cursor")
+
+
+def _page_key(filters: FileListFilters, limit: int | None, cursor: str | None) -> str:
+    """Cache key of a listing page; "all" for the unfiltered full listing"""
+    params = {
+        key: value
+        for key, value in {**asdict(filters), "limit": limit, "cursor": cursor}.items()
+        if value is not None
+    }
+    if not params:
+        return "all"
+    canonical = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
 
 
 class FileController(Controller):
     path = "/files"
-    dependencies = {"files_repo": Provide(provide_files_repo)}
+    dependencies = {
+        "files_repo": Provide(provide_files_repo),
+        "users_repo": Provide(provide_users_repo),
+        "replica_session": Provide(provide_replica_session),
+        "replica_files_repo": Provide(provide_replica_files_repo),
+    }
     tags = ["files"]
 
     @get("/")
     async def get_files(
         self,
         request: Request[AuthUser, Token, Any],
-        files_repo: FileRepository,
-    ) -> FileListResponse:
+        replica_files_repo: FileRepository,
+        content_type: str | None = None,
+        uploaded_after: datetime | None = None,
+        uploaded_before: datetime | None = None,
+        status: UploadStatus | None = None,
+        name: Annotated[str | None, Parameter(min_length=1, max_length=255)] = None,
+        name_prefix: Annotated[
+            str | None, Parameter(min_length=1, max_length=255)
+        ] = None,
+        limit: Annotated[int | None, Parameter(ge=1, le=_MAX_PAGE_SIZE)] = None,
+        cursor: str | None = None,
+    ) -> Response[FileListResponse]:
+        """List the user's files, newest first
+
+        Filters combine with AND. With `limit` the listing is paged: pass
+        `next_cursor` of a page as `cursor` to get the next one.
+        """
         user_id = request.user.id
-        files = await files_repo.get_user_files(files_repo.session, user_id)
+        filters = FileListFilters(
+            content_type=content_type,
+            uploaded_after=_as_naive_utc(uploaded_after),
+            uploaded_before=_as_naive_utc(uploaded_before),
+            status=status,
+            name_contains=name,
+            name_prefix=name_prefix,
+        )
+        after = _decode_cursor(cursor) if cursor else None
+        page_key = _page_key(filters, limit, cursor)
 
-        file_infos = [
-            FileInfo(
-                id=str(file.id),
-                filename=file.filename,
-                original_filename=file.original_filename,
-                content_type=file.content_type,
-                file_size=file.file_size,
-                upload_date=file.upload_date,
-                uploaded_by=str(file.uploaded_by),
+        # The listing version doubles as a validator, so unchanged listings
+        # are answered without touching Postgres or the cached page
+        version = await file_listing_cache_service.get_version(user_id)
+        etag = make_etag("files", user_id, version, page_key)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        async def load_listing() -> str:
+            # One extra row tells whether another page follows
+            rows = await replica_files_repo.list_user_files(
+                replica_files_repo.session,
+                user_id,
+                filters,
+                limit=limit + 1 if limit else None,
+                after=after,
             )
-            for file in files
-        ]
+            next_cursor = None
+            if limit and len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = _encode_cursor(rows[-1].upload_date, rows[-1].id)
+            file_infos = [
+                FileInfo(
+                    id=str(row.id),
+                    filename=row.filename,
+                    original_filename=row.original_filename,
+                    content_type=row.content_type,
+                    file_size=row.file_size,
+                    upload_date=row.upload_date,
+                    uploaded_by=str(row.uploaded_by),
+                )
+                for row in rows
+            ]
+            return FileListResponse(
+                files=file_infos, total_count=len(file_infos), next_cursor=next_cursor
+            ).model_dump_json()
 
-        return FileListResponse(files=file_infos, total_count=len(file_infos))
+        listing = await file_listing_cache_service.get_or_load(
+            user_id, page_key, load_listing, version=version
+        )
+        return Response(
+            FileListResponse.model_validate_json(listing),
+            headers=validator_headers(etag),
+        )
+
+    @get("/events")
+    async def upload_events(
+        self, request: Request[AuthUser, Token, Any]
+    ) -> ServerSentEvent:
+        """Server-Sent Events stream of the user's upload status changes"""
+        last_event_id = request.headers.get("last-event-id")
+        if last_event_id:
+            try:
+                stream_id_key(last_event_id)
+            except ValueError:
+                last_event_id = None
+
+        return ServerSentEvent(
+            self._iter_upload_events(request.user.id, last_event_id),
+            retry_duration=_SSE_RETRY_MILLISECONDS,
+        )
+
+    @staticmethod
+    async def _iter_upload_events(
+        user_id: uuid.UUID, last_event_id: str | None
+    ) -> AsyncIterator[ServerSentEventMessage]:
+        # Subscribe before replaying so nothing published in between is lost
+        subscription = await upload_events_service.subscribe(user_id)
+        try:
+            last_seen = stream_id_key(last_event_id) if last_event_id else None
+            if last_event_id:
+                for event_id, data in await upload_events_service.replay(
+                    user_id, last_event_id
+                ):
+                    last_seen = stream_id_key(event_id)
+                    yield ServerSentEventMessage(data=data, id=event_id)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=_SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ServerSentEventMessage(comment="heartbeat")
+                    continue
+                if item is None:
+                    # Client fell behind; closing makes it reconnect and replay
+                    return
+
+                event_id, data = item
+                if last_seen and stream_id_key(event_id) <= last_seen:
+                    continue
+                last_seen = stream_id_key(event_id)
+                yield ServerSentEventMessage(data=data, id=event_id)
+        finally:
+            upload_events_service.unsubscribe(user_id, subscription)
 
     @get("/{file_id:str}/download")
     async def download_file(
         self,
         request: Request[AuthUser, Token, Any],
-        files_repo: FileRepository,
+        replica_files_repo: FileRepository,
         file_id: str,
     ) -> FileDownloadResponse:
         user_id = request.user.id
-        file = await files_repo.get_user_file_by_id(
-            files_repo.session, file_id, user_id
+        file = await replica_files_repo.get_user_file_by_id(
+            replica_files_repo.session, file_id, user_id
         )
 
         if not file:
@@ -99,6 +295,71 @@ class FileController(Controller):
             filename=file.original_filename,
         )
 
+    @get("/{file_id:str}/preview")
+    async def preview_file(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+        file_id: str,
+        rows: Annotated[int, Parameter(ge=1, le=PREVIEW_MAX_ROWS)] = 20,
+    ) -> FilePreviewResponse:
+        """Preview the header and first rows of an uploaded CSV file"""
+        user_id = request.user.id
+        file = await files_repo.get_user_file_by_id(
+            files_repo.session, file_id, user_id
+        )
+
+        if not file:
+            raise NotFoundException("File not found")
+        if file.upload_status != UploadStatus.COMPLETED:
+            raise ClientException("File upload has not completed yet")
+
+        try:
+            preview = await file_preview_service.get_preview(file.s3_key, file.etag)
+        except InternalServerException as e:
+            error_msg = str(e)
+            if "nosuchkey" in error_msg.lower() or "404" in error_msg:
+                raise NotFoundException(
+                    f"File not available for preview: {file.original_filename}"
+                )
+            raise InternalServerException(
+                f"Preview currently unavailable: {file.original_filename}"
+            )
+
+        return FilePreviewResponse(
+            file_id=file_id,
+            encoding=preview.encoding,
+            delimiter=preview.delimiter,
+            header=preview.header,
+            rows=preview.rows[:rows],
+            truncated=preview.truncated,
+        )
+
+    @get("/{file_id:str}/stats")
+    async def get_file_stats(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+        file_id: str,
+    ) -> FileStatsResponse:
+        """Per-column statistics computed once the upload has completed"""
+        user_id = request.user.id
+        file = await files_repo.get_user_file_by_id(
+            files_repo.session, file_id, user_id
+        )
+
+        if not file:
+            raise NotFoundException("File not found")
+        if not is_csv_file(file.content_type, file.original_filename):
+            # Only CSV files are processed; their stats would never appear
+            return FileStatsResponse(file_id=file_id, status="unsupported")
+        if not file.stats:
+            return FileStatsResponse(file_id=file_id, status="pending")
+        if "error" in file.stats:
+            return FileStatsResponse(file_id=file_id, status="failed")
+
+        return FileStatsResponse(file_id=file_id, status="completed", **file.stats)
+
     @delete("/{file_id:str}", status_code=200)
     async def delete_file(
         self,
@@ -113,28 +374,94 @@ class FileController(Controller):
 
         if not success:
             raise NotFoundException("File not found")
+        await file_listing_cache_service.bump_version(user_id)
+        await readings_cache_service.invalidate_user(user_id)
 
         return FileDeleteResponse(
             message="File removed from list successfully", deleted_file_id=file_id
         )
 
+    @post("/delete", status_code=200)
+    async def delete_files(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+        data: FileBulkDeleteRequest,
+    ) -> FileBulkDeleteResponse:
+        """Remove several files from the list in a single statement"""
+        user_id = request.user.id
+        file_uuids = {}
+        for file_id in data.file_ids:
+            try:
+                file_uuids[file_id] = uuid.UUID(file_id)
+            except ValueError:
+                continue
+
+        deleted_ids = set()
+        if file_uuids:
+            deleted_ids = set(
+                await files_repo.soft_delete_files(
+                    files_repo.session, list(set(file_uuids.values())), user_id
+                )
+            )
+        if deleted_ids:
+            await file_listing_cache_service.bump_version(user_id)
+            await readings_cache_service.invalidate_user(user_id)
+
+        return FileBulkDeleteResponse(
+            deleted_file_ids=[
+                file_id
+                for file_id in data.file_ids
+                if file_uuids.get(file_id) in deleted_ids
+            ],
+            not_found_file_ids=[
+                file_id
+                for file_id in data.file_ids
+                if file_uuids.get(file_id) not in deleted_ids
+            ],
+        )
+
     @post("/upload/presigned")
     async def get_presigned_upload_url(
         self,
         request: Request[AuthUser, Token, Any],
         files_repo: FileRepository,
+        users_repo: UserRepository,
         data: PresignedUploadRequest,
-    ) -> PresignedUploadResponse:
-        """Get presigned URL for direct S3 upload (better for large files)"""
+    ) -> Response[PresignedUploadResponse]:
+        """Get presigned URL for direct S3 upload (better for large files)
+
+        When the user already uploaded the same content (by `checksum_sha256`),
+        the file is created right away on the existing object and no upload
+        URL is returned.
+        """
         user_id = request.user.id
 
+        existing = None
+        if data.checksum_sha256:
+            existing = await files_repo.get_completed_by_checksum(
+                files_repo.session, user_id, data.checksum_sha256
+            )
+        file_size = existing.file_size if existing else data.file_size
+
+        if await storage_quota_service.exceeds_quota_with_pending(
+            users_repo.session, user_id, file_size or 0
+        ):
+            raise HTTPException(status_code=413, detail="Storage quota exceeded")
+
+        if existing:
+            return await self._create_duplicate_file(
+                files_repo, users_repo, user_id, data, existing
+            )
+
         # Pre-create file record with PENDING status (file_size will be updated after upload)
         file_model = FileModel(
             id=uuid.uuid4(),
             filename=data.filename,
             original_filename=data.filename,
             content_type=data.content_type,
-            file_size=0,  # Will be updated after upload
+            # The declared size is reserved against the quota while pending
+            file_size=data.file_size or 0,
             s3_key="",  # Will be updated after S3 key generation
             s3_bucket=s3_service.bucket_name,
             uploaded_by=user_id,
@@ -151,38 +478,356 @@ class FileController(Controller):
             original_filename=data.filename,
             content_type=data.content_type,
             expires_in=_PRESIGNED_URL_EXPIRY_SECONDS,
+            content_length=data.file_size,
+            checksum_sha256=data.checksum_sha256,
         )
 
         # Update the file record with the S3 key
         file_model.s3_key = s3_key
+        file_model.checksum_sha256 = data.checksum_sha256
         await files_repo.add(file_model, auto_commit=True)
+        await upload_trace_context_store.save(s3_key)
+        # Pin before publishing; the before_send pin only runs after this
+        await replica_router.pin_primary(user_id)
+        await file_listing_cache_service.bump_version(user_id)
+        await upload_events_service.publish(
+            user_id,
+            "upload_status",
+            file_id=file_model.id,
+            status=UploadStatus.PENDING,
+        )
 
         expires_at = datetime.utcnow() + timedelta(
             seconds=_PRESIGNED_URL_EXPIRY_SECONDS
         )
 
-        return PresignedUploadResponse(
-            upload_url=upload_url,
-            s3_key=s3_key,
-            expires_at=expires_at,
-            file_id=str(file_model.id),  # Return file ID for webhook
+        return Response(
+            PresignedUploadResponse(
+                upload_url=upload_url,
+                s3_key=s3_key,
+                expires_at=expires_at,
+                file_id=str(file_model.id),  # Return file ID for webhook
+            )
+        )
+
+    async def _create_duplicate_file(
+        self,
+        files_repo: FileRepository,
+        users_repo: UserRepository,
+        user_id: str,
+        data: PresignedUploadRequest,
+        existing: FileModel,
+    ) -> Response[PresignedUploadResponse]:
+        """Complete a new file at once on the object of an identical upload"""
+        file_model = FileModel(
+            id=uuid.uuid4(),
+            filename=data.filename,
+            original_filename=data.filename,
+            content_type=data.content_type,
+            file_size=existing.file_size,
+            s3_key=existing.s3_key,
+            s3_bucket=existing.s3_bucket,
+            etag=existing.etag,
+            checksum_sha256=existing.checksum_sha256,
+            stats=existing.stats,
+            uploaded_by=user_id,
+            upload_date=datetime.utcnow(),
+            upload_status=UploadStatus.COMPLETED,
+        )
+        files_repo.session.add(file_model)
+        # Every file counts towards usage, whether or not its object is shared
+        await users_repo.adjust_storage_usage(
+            files_repo.session, user_id, bytes_delta=file_model.file_size, files_delta=1
+        )
+        if file_model.stats is not None:
+            # Same content, same alert windows; unprocessed copies get their own
+            await files_repo.session.flush()
+            await AlertEventRepository(session=files_repo.session).copy_file_events(
+                files_repo.session, existing.id, file_model.id
+            )
+        await files_repo.session.commit()
+
+        await replica_router.pin_primary(user_id)
+        await file_listing_cache_service.bump_version(user_id)
+        await upload_events_service.publish(
+            user_id,
+            "upload_status",
+            file_id=file_model.id,
+            status=UploadStatus.COMPLETED,
+            file_size=file_model.file_size,
+        )
+
+        response = PresignedUploadResponse(
+            upload_required=False, s3_key=file_model.s3_key, file_id=str(file_model.id)
+        )
+        if file_model.stats is not None:
+            # The new file adds its readings just like a processed upload would
+            await readings_cache_service.invalidate_user(user_id)
+            return Response(response)
+        # The original is still being processed; process the copy on its own
+        return Response(
+            response,
+            background=BackgroundTask(
+                self._process_files, [(file_model.id, tracer.current_context())]
+            ),
+        )
+
+    async def _get_alignment_sources(
+        self, files_repo: FileRepository, file_ids: list[str], user_id: str
+    ) -> list[FileModel]:
+        try:
+            file_uuids = [uuid.UUID(file_id) for file_id in file_ids]
+        except ValueError:
+            raise NotFoundException("File not found")
+
+        files = await files_repo.get_user_files_by_ids(
+            files_repo.session, file_uuids, user_id
+        )
+        files_by_id = {file.id: file for file in files}
+        if len(files_by_id) != len(set(file_uuids)):
+            raise NotFoundException("File not found")
+        if any(file.upload_status != UploadStatus.COMPLETED for file in files):
+            raise ClientException("File upload has not completed yet")
+        return [files_by_id[file_uuid] for file_uuid in file_uuids]
+
+    @post("/align")
+    async def align_files(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+        data: FileAlignRequest,
+    ) -> Stream:
+        """Stream several files resampled onto a common time grid as one CSV"""
+        files = await self._get_alignment_sources(
+            files_repo, data.file_ids, request.user.id
+        )
+        cursors = await time_alignment_service.prepare(files, data.frequency_ms)
+
+        return Stream(
+            time_alignment_service.iter_aligned_csv(
+                cursors, data.frequency_ms, data.method
+            ),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="aligned.csv"'},
+        )
+
+    @post("/align/export", status_code=202)
+    async def export_aligned_files(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+        data: FileAlignRequest,
+    ) -> Response[FileAlignResponse]:
+        """Write the aligned result to S3 as a new file, in the background"""
+        user_id = request.user.id
+        files = await self._get_alignment_sources(files_repo, data.file_ids, user_id)
+        # The output size is unknown yet; it is checked again once written
+        if await storage_quota_service.exceeds_quota_with_pending(
+            files_repo.session, user_id
+        ):
+            raise HTTPException(status_code=413, detail="Storage quota exceeded")
+        cursors = await time_alignment_service.prepare(files, data.frequency_ms)
+
+        # Pre-create the output record; the S3 key is set once the upload finishes
+        filename = f"aligned_{datetime.utcnow():%Y%m%dT%H%M%S}.csv"
+        file_model = FileModel(
+            id=uuid.uuid4(),
+            filename=filename,
+            original_filename=filename,
+            content_type="text/csv",
+            file_size=0,
+            s3_key="",
+            s3_bucket=s3_service.bucket_name,
+            uploaded_by=user_id,
+            upload_date=datetime.utcnow(),
+            upload_status=UploadStatus.PENDING,
+        )
+        await files_repo.add(file_model, auto_commit=True)
+        await replica_router.pin_primary(user_id)
+        await file_listing_cache_service.bump_version(user_id)
+        await upload_events_service.publish(
+            user_id,
+            "upload_status",
+            file_id=file_model.id,
+            status=UploadStatus.PENDING,
+        )
+
+        return Response(
+            FileAlignResponse(file_id=str(file_model.id), status=UploadStatus.PENDING),
+            status_code=202,
+            background=BackgroundTask(
+                time_alignment_service.export_to_s3,
+                file_model.id,
+                str(user_id),
+                cursors,
+                data.frequency_ms,
+                data.method,
+            ),
+        )
+
+    @post("/export", status_code=202)
+    async def export_files(
+        self,
+        request: Request[AuthUser, Token, Any],
+        files_repo: FileRepository,
+    ) -> Response[FileExportJobResponse]:
+        """Start a zip export of all the user's uploaded files"""
+        user_id = request.user.id
+        files = await files_repo.get_user_files(files_repo.session, user_id)
+        entries = [
+            ExportEntry(
+                s3_key=file.s3_key,
+                filename=file.original_filename,
+                upload_date=file.upload_date,
+            )
+            for file in files
+            if file.upload_status == UploadStatus.COMPLETED
+        ]
+
+        job_id = await file_export_service.create_job(user_id, len(entries))
+        if not job_id:
+            raise HTTPException(
+                status_code=429, detail="Export limit reached; try again later"
+            )
+        return Response(
+            FileExportJobResponse(
+                job_id=job_id,
+                status=ExportJobStatus.PENDING,
+                file_count=len(entries),
+            ),
+            status_code=202,
+            background=BackgroundTask(
+                file_export_service.run_export, job_id, user_id, entries
+            ),
+        )
+
+    @get("/export/{job_id:str}")
+    async def get_export_job(
+        self,
+        request: Request[AuthUser, Token, Any],
+        job_id: str,
+    ) -> FileExportJobResponse:
+        """Export job status, with a download URL once the archive is ready"""
+        job = await file_export_service.get_job(job_id, request.user.id)
+        if not job:
+            raise NotFoundException("Export job not found")
+
+        response = FileExportJobResponse(
+            job_id=job_id,
+            status=job["status"],
+            file_count=int(job["file_count"]),
         )
+        if job["status"] == ExportJobStatus.COMPLETED:
+            response.download_url = s3_service.generate_presigned_url(job["s3_key"])
+            response.expires_at = datetime.utcnow() + timedelta(
+                seconds=s3_service.presigned_url_expiry
+            )
+            response.archive_size = int(job["archive_size"])
+        return response
 
     @post("/webhook/s3-upload", exclude_from_auth=True)
     async def s3_upload_webhook(
         self,
         files_repo: FileRepository,
+        users_repo: UserRepository,
         data: list[S3WebhookEvent],
-    ) -> dict[str, str]:
+    ) -> Response[dict[str, str]]:
         """Webhook endpoint for S3 upload completion notifications"""
+        completed_files = []
         for event in data:
             if event.eventName.startswith("ObjectCreated"):
                 s3_key = event.s3.object.key
                 file_size = event.s3.object.size
                 # Find and update the file record
                 file_record = await files_repo.get_by_s3_key(s3_key)
-                if file_record:
+                if not file_record:
+                    continue
+
+                # Continue the trace of the presign request that started the upload
+                upload_context = await upload_trace_context_store.pop(s3_key)
+                with tracer.span(
+                    "upload.complete",
+                    parent=upload_context,
+                    **{
+                        "file.id": str(file_record.id),
+                        "file.size": file_size,
+                        "webhook.traceparent": tracer.current_traceparent(),
+                    },
+                ):
+                    # Repeated notifications (or overwrites) only count the size change
+                    was_counted = (
+                        file_record.upload_status == UploadStatus.COMPLETED
+                        and not file_record.is_deleted
+                    )
+                    # Uploads without a declared size, or outliving their
+                    # reservation, are only checked against the quota here
+                    if not was_counted and not file_record.is_deleted:
+                        usage = await users_repo.get_storage_usage(
+                            files_repo.session, file_record.uploaded_by
+                        )
+                        if usage and storage_quota_service.exceeds_quota(
+                            *usage, file_size
+                        ):
+                            await self._reject_over_quota(files_repo, file_record)
+                            continue
+                    if not file_record.is_deleted:
+                        await users_repo.adjust_storage_usage(
+                            files_repo.session,
+                            file_record.uploaded_by,
+                            bytes_delta=file_size
+                            - (file_record.file_size if was_counted else 0),
+                            files_delta=0 if was_counted else 1,
+                        )
                     file_record.upload_status = UploadStatus.COMPLETED
                     file_record.file_size = file_size
+                    file_record.etag = event.s3.object.eTag
                     await files_repo.session.commit()
-        return {"status": "processed"}
+                    completed_files.append((file_record.id, tracer.current_context()))
+                    # Clients react to the event by listing their files; make
+                    # sure that listing includes this change before sending it
+                    await replica_router.pin_primary(file_record.uploaded_by)
+                    await file_listing_cache_service.bump_version(
+                        file_record.uploaded_by
+                    )
+                    await upload_events_service.publish(
+                        file_record.uploaded_by,
+                        "upload_status",
+                        file_id=file_record.id,
+                        status=UploadStatus.COMPLETED,
+                        file_size=file_size,
+                    )
+
+        return Response(
+            {"status": "processed"},
+            background=BackgroundTask(self._process_files, completed_files),
+        )
+
+    @staticmethod
+    async def _reject_over_quota(
+        files_repo: FileRepository, file_record: FileModel
+    ) -> None:
+        """Fail a completed upload that doesn't fit the quota and delete its object"""
+        file_record.upload_status = UploadStatus.FAILED
+        await files_repo.session.commit()
+        if await s3_service.delete_files([file_record.s3_key]):
+            logger.warning("Failed to delete over-quota upload %s", file_record.s3_key)
+
+        await replica_router.pin_primary(file_record.uploaded_by)
+        await file_listing_cache_service.bump_version(file_record.uploaded_by)
+        await upload_events_service.publish(
+            file_record.uploaded_by,
+            "upload_status",
+            file_id=file_record.id,
+            status=UploadStatus.FAILED,
+        )
+
+    @staticmethod
+    async def _process_files(
+        completed_files: list[tuple[uuid.UUID, SpanContext | None]],
+    ) -> None:
+        """Run post-upload processing after the webhook has been acknowledged"""
+        for file_id, trace_context in completed_files:
+            with tracer.span(
+                "file.process", parent=trace_context, **{"file.id": str(file_id)}
+            ):
+                await file_processing_service.process_file(file_id)
@@ -0,0 +1,30 @@
+import hmac
+
+from litestar.connection import ASGIConnection
+from litestar.exceptions import NotAuthorizedException
+from litestar.handlers import BaseRouteHandler
+from litestar.plugins.prometheus import PrometheusController
+
+from app.config import settings
+
+
+def require_metrics_token(connection: ASGIConnection, _: BaseRouteHandler) -> None:
+    """Require the configured bearer token, if any"""
+    token = settings.metrics.token
+    if not token:
+        return
+    scheme, _, value = connection.headers.get("authorization", "").partition(" ")
+    # Bytes: comparing str raises on non-ASCII header values
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        value.encode(), token.encode()
+    ):
+        raise NotAuthorizedException("Invalid metrics token")
+
+
+class MetricsController(PrometheusController):
+    path = settings.metrics.path
+    include_in_schema = False
+    # Scraped by Prometheus, which does not hold user tokens; it sends the
+    # metrics token instead when one is configured
+    opt = {"exclude_from_auth": True}
+    guards = [require_metrics_token]
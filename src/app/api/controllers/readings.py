@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from litestar import Controller, Request, get
+from litestar.exceptions import ClientException
+from litestar.security.jwt import Token
+import numpy as np
+from app.api.schemas.readings import ReadingsResponse
+from app.services.readings_cache_service import readings_cache_service
+from app.auth.jwt import AuthUser
+from typing import Any
+
+
+class ReadingsController(Controller):
+    path = "/readings"
+    tags = ["readings"]
+
+    @get("/{metric:str}")
+    async def get_readings(
+        self,
+        request: Request[AuthUser, Token, Any],
+        metric: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> ReadingsResponse:
+        """Recent readings of one metric across the user's files, served from cache"""
+        window_start = readings_cache_service.window_start()
+        start = _as_utc(start) if start else window_start
+        end = _as_utc(end) if end else datetime.now(timezone.utc)
+        if start < window_start:
+            raise ClientException("start is outside the recent readings window")
+
+        timestamps, values = await readings_cache_service.get_readings(
+            str(request.user.id), metric, start, end
+        )
+        return ReadingsResponse(
+            metric=metric,
+            timestamps=timestamps.tolist(),
+            values=np.where(np.isfinite(values), values, None).tolist(),
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -1,38 +1,90 @@
-from litestar import Controller, Request, get, post, patch, delete
+from litestar import Controller, Request, Response, get, post, patch, delete
 from litestar.di import Provide
 from litestar.exceptions import NotFoundException
 from litestar.security.jwt import Token
+from sqlalchemy import select
+from app.api.http_caching import (
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
 from app.db.models.user import UserModel
-from app.api.schemas.user import User, UserCreate, UserUpdate
-from app.db.repositories.user import UserRepository, provide_users_repo
+from app.api.schemas.user import StorageUsage, User, UserCreate, UserUpdate
+from app.db.replicas import provide_replica_session
+from app.db.repositories.user import (
+    UserRepository,
+    provide_replica_users_repo,
+    provide_users_repo,
+)
 from app.auth.jwt import AuthUser
+from app.config import settings
+from app.services.rate_limit_service import rate_limit_service
 from typing import Any
 
 
 class UserController(Controller):
     path = "/users"
-    dependencies = {"users_repo": Provide(provide_users_repo)}
+    dependencies = {
+        "users_repo": Provide(provide_users_repo),
+        "replica_session": Provide(provide_replica_session),
+        "replica_users_repo": Provide(provide_replica_users_repo),
+    }
     tags = ["users"]
 
     @post("/", exclude_from_auth=True)
     async def create_user(
         self,
+        request: Request,
         users_repo: UserRepository,
         data: UserCreate,
     ) -> User:
+        client_ip = request.client.host if request.client else None
+        await rate_limit_service.check("signup", client_ip)
+
         user_model = UserModel(name=data.name, email=str(data.email))
-        user_model.set_password(data.password)
+        await user_model.set_password_async(data.password)
         await users_repo.add(user_model, auto_commit=True)
         return User(name=data.name, email=data.email)
 
     @get("/me")
     async def get_user(
-        self, users_repo: UserRepository, request: Request[AuthUser, Token, Any]
-    ) -> User:
-        user = await users_repo.get_one_or_none(UserModel.id == str(request.user.id))
+        self, replica_users_repo: UserRepository, request: Request[AuthUser, Token, Any]
+    ) -> Response[User]:
+        # Check the validator with a single-column query before loading the row
+        updated_at = await replica_users_repo.session.scalar(
+            select(UserModel.updated_at).where(UserModel.id == request.user.id)
+        )
+        if updated_at is None:
+            raise NotFoundException(status_code=404, detail="User not found")
+
+        # Usage counters bump updated_at; the limits come from configuration
+        quota = settings.storage_quota
+        etag = make_etag(
+            "user",
+            request.user.id,
+            updated_at.isoformat(),
+            quota.max_bytes_per_user,
+            quota.max_files_per_user,
+        )
+        if is_not_modified(request, etag, updated_at):
+            return not_modified_response(etag, updated_at)
+
+        user = await replica_users_repo.get_one_or_none(
+            UserModel.id == str(request.user.id)
+        )
         if not user:
             raise NotFoundException(status_code=404, detail="User not found")
-        return User(name=user.name, email=user.email)
+        storage = StorageUsage(
+            bytes_used=user.storage_bytes_used,
+            file_count=user.storage_file_count,
+            max_bytes=quota.max_bytes_per_user,
+            max_files=quota.max_files_per_user,
+        )
+        return Response(
+            User(name=user.name, email=user.email, storage=storage),
+            headers=validator_headers(etag, updated_at),
+        )
 
     @patch("/me")
     async def update_user(
@@ -47,7 +99,7 @@ class UserController(Controller):
         if data.name:
             user.name = data.name
         if data.password:
-            user.set_password(data.password)
+            await user.set_password_async(data.password)
         await users_repo.update(
             user,
             id_attribute=UserModel.email,
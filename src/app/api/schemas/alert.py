@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from app.db.models.alert import AlertOperator
+
+
+class AlertRuleCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    metric: str = Field(min_length=1, max_length=100, description="CSV column name")
+    operator: AlertOperator
+    threshold: float
+    min_duration_seconds: float = Field(
+        default=0, ge=0, description="Time the condition must hold"
+    )
+    is_enabled: bool = True
+
+
+class AlertRuleUpdate(BaseModel):
+    name: str | None = Field(default=None, min_length=1, max_length=100)
+    metric: str | None = Field(default=None, min_length=1, max_length=100)
+    operator: AlertOperator | None = None
+    threshold: float | None = None
+    min_duration_seconds: float | None = Field(default=None, ge=0)
+    is_enabled: bool | None = None
+
+
+class AlertRule(BaseModel):
+    id: str
+    name: str
+    metric: str
+    operator: AlertOperator
+    threshold: float
+    min_duration_seconds: float
+    is_enabled: bool
+
+
+class AlertEvent(BaseModel):
+    id: str
+    rule_id: str
+    file_id: str
+    start_time: datetime
+    end_time: datetime
+    duration_seconds: float
+    sample_count: int
+    peak_value: float
+
+
+class AlertEventListResponse(BaseModel):
+    events: list[AlertEvent]
+    total_count: int
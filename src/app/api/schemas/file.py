@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Literal
 
 
 class FileInfo(BaseModel):
@@ -24,6 +25,7 @@ class FileUploadResponse(BaseModel):
 class FileListResponse(BaseModel):
     files: list[FileInfo]
     total_count: int
+    next_cursor: str | None = None
 
 
 class FileDownloadResponse(BaseModel):
@@ -32,20 +34,89 @@ class FileDownloadResponse(BaseModel):
     filename: str
 
 
+class FilePreviewResponse(BaseModel):
+    file_id: str
+    encoding: str
+    delimiter: str
+    header: list[str]
+    rows: list[list[str]]
+    truncated: bool
+
+
+class ColumnStats(BaseModel):
+    count: int
+    null_count: int
+    min: float | None = None
+    max: float | None = None
+    mean: float | None = None
+    stddev: float | None = None
+
+
+class TimeCoverage(BaseModel):
+    column: str
+    start: datetime
+    end: datetime
+    duration_seconds: float
+
+
+class FileStatsResponse(BaseModel):
+    file_id: str
+    status: Literal["pending", "completed", "failed", "unsupported"]
+    row_count: int | None = None
+    columns: dict[str, ColumnStats] = {}
+    time_coverage: TimeCoverage | None = None
+
+
+class FileAlignRequest(BaseModel):
+    file_ids: list[str] = Field(min_length=2, max_length=10)
+    frequency_ms: int = Field(gt=0, description="Target sampling interval")
+    method: Literal["interpolate", "ffill"] = "interpolate"
+
+
+class FileAlignResponse(BaseModel):
+    file_id: str
+    status: str
+
+
+class FileExportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    file_count: int
+    download_url: str | None = None
+    expires_at: datetime | None = None
+    archive_size: int | None = None
+
+
 class FileDeleteResponse(BaseModel):
     message: str
     deleted_file_id: str
 
 
+class FileBulkDeleteRequest(BaseModel):
+    file_ids: list[str] = Field(min_length=1, max_length=1000)
+
+
+class FileBulkDeleteResponse(BaseModel):
+    deleted_file_ids: list[str]
+    not_found_file_ids: list[str]
+
+
 class PresignedUploadRequest(BaseModel):
     filename: str
     content_type: str
+    # When given, it is reserved against the quota and bound to the upload
+    # URL; uploads without it are checked against the quota on completion
+    file_size: int | None = Field(default=None, ge=0)
+    # Base64 SHA-256 of the content; S3 rejects uploads that don't match it
+    checksum_sha256: str | None = Field(default=None, pattern=r"^[A-Za-z0-9+/]{43}=$")
 
 
 class PresignedUploadResponse(BaseModel):
-    upload_url: str
+    # No upload is needed when the same content was already uploaded
+    upload_required: bool = True
+    upload_url: str | None = None
     s3_key: str
-    expires_at: datetime
+    expires_at: datetime | None = None
     file_id: str
     fields: dict[str, str] | None = None
 
@@ -60,6 +131,7 @@ class UploadConfirmRequest(BaseModel):
 class S3ObjectInfo(BaseModel):
     key: str
     size: int
+    eTag: str | None = None
 
 
 class S3Info(BaseModel):
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class ReadingsResponse(BaseModel):
+    metric: str
+    timestamps: list[float]
+    values: list[float | None]
@@ -1,9 +1,17 @@
 from pydantic import BaseModel, EmailStr
 
 
+class StorageUsage(BaseModel):
+    bytes_used: int
+    file_count: int
+    max_bytes: int
+    max_files: int
+
+
 class User(BaseModel):
     name: str
     email: str
+    storage: StorageUsage | None = None
 
 
 class UserCreate(BaseModel):
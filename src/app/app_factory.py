@@ -1,22 +1,37 @@
-from math import e
-from litestar import Litestar
-from litestar.plugins.sqlalchemy import (
-    SQLAlchemyAsyncConfig,
-    SQLAlchemyPlugin,
-)
+from litestar import Litestar, Response
 from dataclasses import dataclass
 from litestar.openapi.config import OpenAPIConfig
 from litestar.openapi.plugins import StoplightRenderPlugin, SwaggerRenderPlugin
 from litestar.config.cors import CORSConfig
 from litestar.logging import LoggingConfig
+from litestar.plugins.prometheus import PrometheusConfig
 from litestar.handlers.http_handlers.decorators import get
 from typing import Literal
-from litestar.plugins.sqlalchemy import base
 from app.api.controllers.user import UserController
+from app.api.controllers.alert import AlertController
 from app.api.controllers.auth import AuthController
 from app.api.controllers.file import FileController
+from app.api.controllers.readings import ReadingsController
+from app.api.controllers.metrics import MetricsController
 from app.auth.jwt import jwt_auth
 from app.config import settings
+from app.db.config import db_plugin
+from app.db.replicas import pin_primary_after_write, replica_router
+from app.observability.db import install_db_metrics
+from app.observability.metrics import mark_worker_stopped
+from app.observability.queries import QueryBudgetMiddleware, install_query_tracking
+from app.observability.tracing import TracingMiddleware, install_db_tracing
+from app.observability.profiling import ProfilingMiddleware
+from app.observability.propagation import upload_trace_context_store
+from app.services.file_export_service import file_export_service
+from app.services.file_listing_cache_service import file_listing_cache_service
+from app.services.file_preview_service import file_preview_service
+from app.services.rate_limit_service import rate_limit_service
+from app.services.readiness_service import Readiness, readiness_service
+from app.services.readings_cache_service import readings_cache_service
+from app.services.redis_token_service import token_service
+from app.services.storage_quota_service import storage_quota_service
+from app.services.upload_events_service import upload_events_service
 
 
 @dataclass
@@ -29,12 +44,29 @@ def health_check() -> HealthCheck:
     return HealthCheck(status="ok")
 
 
-_CONFIG = SQLAlchemyAsyncConfig(
-    connection_string=str(settings.database.url),
-    create_all=True,
-    metadata=base.orm_registry.metadata,
+@get("/ready", tags=["health"], exclude_from_auth=True)
+async def readiness_check() -> Response[Readiness]:
+    readiness = readiness_service.readiness()
+    return Response(readiness, status_code=200 if readiness.status == "ready" else 503)
+
+
+# Services holding a Redis client: prewarmed on startup, closed on shutdown
+_REDIS_SERVICES = (
+    token_service,
+    rate_limit_service,
+    upload_events_service,
+    file_listing_cache_service,
+    file_export_service,
+    file_preview_service,
+    readings_cache_service,
+    upload_trace_context_store,
 )
-_PLUGIN = SQLAlchemyPlugin(config=_CONFIG)
+
+
+async def close_connections() -> None:
+    """Close Redis pools and replica engines; the primary is disposed by its plugin"""
+    for service in (replica_router, readiness_service, *_REDIS_SERVICES):
+        await service.disconnect()
 
 
 def create_app():
@@ -43,8 +75,39 @@ def create_app():
         log_exceptions="always",
     )
 
+    route_handlers = [
+        health_check,
+        readiness_check,
+        UserController,
+        AuthController,
+        FileController,
+        ReadingsController,
+        AlertController,
+    ]
+    middleware = []
+    if settings.tracing.enabled:
+        install_db_tracing()
+        middleware.append(TracingMiddleware())
+    if settings.metrics.enabled:
+        install_db_metrics()
+        route_handlers.append(MetricsController)
+        # Group by route template so label cardinality stays bounded
+        prometheus_config = PrometheusConfig(
+            app_name=settings.app_name,
+            prefix="http",
+            group_path=True,
+            exclude=[settings.metrics.path],
+        )
+        middleware.append(prometheus_config.middleware)
+    if settings.profiling.enabled:
+        middleware.append(ProfilingMiddleware())
+    if settings.query_budget.enabled:
+        install_query_tracking()
+        middleware.append(QueryBudgetMiddleware())
+
     return Litestar(
-        route_handlers=[health_check, UserController, AuthController, FileController],
+        route_handlers=route_handlers,
+        middleware=middleware,
         openapi_config=OpenAPIConfig(
             title=settings.app_name,
             description=settings.app_name,
@@ -57,7 +120,14 @@ def create_app():
             allow_methods=settings.cors_allow_methods_list,
             allow_headers=settings.cors_allow_headers_list,
         ),
-        plugins=[_PLUGIN],
+        plugins=[db_plugin],
+        before_send=[pin_primary_after_write] if replica_router.enabled else [],
+        lifespan=[
+            readiness_service.lifespan(_REDIS_SERVICES),
+            storage_quota_service.lifespan,
+            file_export_service.lifespan,
+        ],
         on_app_init=[jwt_auth.on_app_init],
+        on_shutdown=[close_connections, mark_worker_stopped],
         logging_config=logging_config,
     )
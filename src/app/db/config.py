@@ -0,0 +1,29 @@
+from litestar.plugins.sqlalchemy import (
+    EngineConfig,
+    SQLAlchemyAsyncConfig,
+    SQLAlchemyPlugin,
+)
+from litestar.plugins.sqlalchemy import base
+from app.config import settings
+from app.observability.db import TimedAsyncQueuePool
+
+# Shared by the primary and replica engines
+engine_options = {
+    "poolclass": TimedAsyncQueuePool,
+    "pool_size": settings.database.pool_size,
+    "max_overflow": settings.database.max_overflow,
+    "pool_timeout": settings.database.pool_timeout,
+    "pool_recycle": settings.database.pool_recycle,
+    "pool_pre_ping": settings.database.pool_pre_ping,
+    "connect_args": {
+        "prepared_statement_cache_size": settings.database.prepared_statement_cache_size
+    },
+}
+
+db_config = SQLAlchemyAsyncConfig(
+    connection_string=str(settings.database.url),
+    create_all=settings.database.create_all,
+    engine_config=EngineConfig(**engine_options),
+    metadata=base.orm_registry.metadata,
+)
+db_plugin = SQLAlchemyPlugin(config=db_config)
@@ -0,0 +1,72 @@
+"""Schema migration, run once per deploy before starting the API
+
+uv run migrate
+"""
+
+import asyncio
+import logging
+
+from litestar.plugins.sqlalchemy import base
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+
+# Register every model on the metadata
+from app.db.models import alert, file, user  # noqa: F401
+from app.db.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key of the advisory lock serializing migrations of concurrently
+# starting containers
+_MIGRATE_LOCK_KEY = 7_302_514
+
+# create_all only creates missing tables, so columns added to existing tables
+# are listed here; missing indexes are created from the models. Every
+# statement must be idempotent.
+_UPGRADES = [
+    "ALTER TABLE files ADD COLUMN IF NOT EXISTS etag VARCHAR(100)",
+    "ALTER TABLE files ADD COLUMN IF NOT EXISTS stats JSON",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS storage_bytes_used BIGINT NOT NULL DEFAULT 0",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS storage_file_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE files ADD COLUMN IF NOT EXISTS checksum_sha256 VARCHAR(44)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+]
+
+
+async def create_schema() -> None:
+    """Create missing tables and apply upgrades to existing ones"""
+    engine = create_async_engine(str(settings.database.url))
+    try:
+        async with engine.begin() as conn:
+            # Held until commit; later containers then find everything in place
+            await conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MIGRATE_LOCK_KEY}
+            )
+            await conn.run_sync(base.orm_registry.metadata.create_all)
+            for statement in _UPGRADES:
+                await conn.execute(text(statement))
+            for table in base.orm_registry.metadata.sorted_tables:
+                for index in table.indexes:
+                    await conn.execute(CreateIndex(index, if_not_exists=True))
+
+        # Usage counters of users that predate them start out at zero
+        async with AsyncSession(engine) as session:
+            corrected = await UserRepository(session=session).reconcile_storage_usage(
+                session
+            )
+        if corrected:
+            logger.info("Initialized storage usage of %d users", corrected)
+    finally:
+        await engine.dispose()
+
+
+def run():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(create_schema())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,53 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Index, ForeignKey, DateTime, Float, text
+from litestar.plugins.sqlalchemy import base
+from datetime import datetime
+from enum import StrEnum
+
+
+class AlertOperator(StrEnum):
+    GT = "gt"
+    GE = "ge"
+    LT = "lt"
+    LE = "le"
+
+
+class AlertRuleModel(base.UUIDAuditBase):
+    """Flags windows where `metric` compares to `threshold` for a minimum time"""
+
+    __tablename__ = "alert_rules"
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    name: Mapped[str] = mapped_column(String(100))
+    # CSV column the rule applies to
+    metric: Mapped[str] = mapped_column(String(100))
+    operator: Mapped[str] = mapped_column(String(2))
+    threshold: Mapped[float] = mapped_column(Float)
+    min_duration_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    is_enabled: Mapped[bool] = mapped_column(default=True)
+
+    __table_args__ = (Index("idx_alert_rules_user_id", "user_id"),)
+
+
+class AlertEventModel(base.UUIDAuditBase):
+    """A window of one file's readings that matched a rule"""
+
+    __tablename__ = "alert_events"
+
+    rule_id: Mapped[str] = mapped_column(
+        ForeignKey("alert_rules.id", ondelete="CASCADE")
+    )
+    file_id: Mapped[str] = mapped_column(ForeignKey("files.id", ondelete="CASCADE"))
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    duration_seconds: Mapped[float] = mapped_column(Float)
+    sample_count: Mapped[int] = mapped_column()
+    # Highest value for gt/ge rules, lowest for lt/le rules
+    peak_value: Mapped[float] = mapped_column(Float)
+
+    __table_args__ = (
+        Index("idx_alert_events_user_start", "user_id", text("start_time DESC")),
+        Index("idx_alert_events_rule_id", "rule_id"),
+        Index("idx_alert_events_file_id", "file_id"),
+    )
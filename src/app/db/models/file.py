@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Index, ForeignKey, DateTime
+from sqlalchemy import DDL, JSON, String, Index, ForeignKey, DateTime, event, text
 from litestar.plugins.sqlalchemy import base
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -24,10 +24,14 @@ class FileModel(base.UUIDAuditBase):
     file_size: Mapped[int] = mapped_column()
     s3_key: Mapped[str] = mapped_column(String(500))
     s3_bucket: Mapped[str] = mapped_column(String(100))
+    etag: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Base64 SHA-256 given by the client; identical uploads share one object
+    checksum_sha256: Mapped[str | None] = mapped_column(String(44), nullable=True)
     uploaded_by: Mapped[str] = mapped_column(ForeignKey("users.id"))
     upload_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     upload_status: Mapped[str] = mapped_column(String(20), default="pending")
     is_deleted: Mapped[bool] = mapped_column(default=False)
+    stats: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
     user: Mapped["UserModel"] = relationship("UserModel", back_populates="files")
 
@@ -36,4 +40,45 @@ class FileModel(base.UUIDAuditBase):
         Index("idx_files_s3_key", "s3_key"),
         Index("idx_files_is_deleted", "is_deleted"),
         Index("idx_files_upload_status", "upload_status"),
+        Index("idx_files_uploaded_by_checksum", "uploaded_by", "checksum_sha256"),
+        # Listing order and keyset pagination; includes the listed columns so
+        # pages can be read with index-only scans
+        Index(
+            "idx_files_user_listing",
+            "uploaded_by",
+            text("upload_date DESC"),
+            text("id DESC"),
+            postgresql_include=[
+                "filename",
+                "original_filename",
+                "content_type",
+                "file_size",
+                "upload_status",
+            ],
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "idx_files_user_content_type",
+            "uploaded_by",
+            "content_type",
+            text("upload_date DESC"),
+            text("id DESC"),
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        # Filename substring and prefix search (ILIKE)
+        Index(
+            "idx_files_original_filename_trgm",
+            "original_filename",
+            postgresql_using="gin",
+            postgresql_ops={"original_filename": "gin_trgm_ops"},
+            postgresql_where=text("NOT is_deleted"),
+        ),
     )
+
+
+# The trigram index needs the extension before the table is created
+event.listen(
+    FileModel.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Index
+from sqlalchemy import BigInteger, String, Index
 from litestar.plugins.sqlalchemy import base
 from typing import TYPE_CHECKING, List
 
@@ -14,6 +14,11 @@ class UserModel(base.UUIDAuditBase):
     name: Mapped[str] = mapped_column(String(50))
     email: Mapped[str] = mapped_column(String(255), unique=True)
     password: Mapped[str] = mapped_column(String(255))
+    # Maintained incrementally with file completion/deletion, see UserRepository
+    storage_bytes_used: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
+    storage_file_count: Mapped[int] = mapped_column(default=0, server_default="0")
 
     files: Mapped[List["FileModel"]] = relationship("FileModel", back_populates="user")
 
@@ -24,3 +29,9 @@ class UserModel(base.UUIDAuditBase):
 
     def verify_password(self, password: str) -> bool:
         return password_service.verify_password(password, self.password)
+
+    async def set_password_async(self, password: str) -> None:
+        self.password = await password_service.hash_password_async(password)
+
+    async def verify_password_async(self, password: str) -> bool:
+        return await password_service.verify_password_async(password, self.password)
@@ -0,0 +1,127 @@
+import itertools
+import logging
+from typing import AsyncGenerator, Iterator, Optional
+from uuid import UUID
+from litestar import Request
+from litestar.types import Message, Scope
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.config import settings
+from app.db.config import engine_options
+from app.observability.redis import InstrumentedRedis
+
+logger = logging.getLogger(__name__)
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaRouter:
+    """Routes read-only sessions to replicas, except right after a user's writes
+
+    Replicas lag slightly behind the primary. Once a user writes, their reads
+    are pinned to the primary for a short window - tracked in Redis so every
+    worker agrees - and they always read their own writes.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.prefix = "db_primary_pin:"
+        self._engines: list[AsyncEngine] = []
+        self._sessionmakers: Iterator[async_sessionmaker[AsyncSession]] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.database.replica_urls_list)
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    def session(self) -> AsyncSession:
+        """New session on the next replica, round robin"""
+        if self._sessionmakers is None:
+            self._engines = [
+                create_async_engine(url, **engine_options)
+                for url in settings.database.replica_urls_list
+            ]
+            self._sessionmakers = itertools.cycle(
+                [
+                    async_sessionmaker(engine, expire_on_commit=False)
+                    for engine in self._engines
+                ]
+            )
+        return next(self._sessionmakers)()
+
+    async def pin_primary(self, user_id: UUID | str) -> None:
+        """Keep the user's reads on the primary while replicas catch up"""
+        if not self.enabled:
+            return
+        if not self.redis:
+            await self._connect()
+        try:
+            await self.redis.set(
+                f"{self.prefix}{user_id}",
+                1,
+                ex=settings.database.replica_primary_pin_seconds,
+            )
+        except Exception:
+            # The write already committed; failing its response would only
+            # make the client retry it. Reads may briefly lag instead.
+            logger.exception("Failed to pin user %s to the primary", user_id)
+
+    async def is_pinned(self, user_id: UUID | str) -> bool:
+        if not self.redis:
+            await self._connect()
+        try:
+            return bool(await self.redis.exists(f"{self.prefix}{user_id}"))
+        except Exception:
+            # Without the pin state, the primary is the safe choice
+            logger.exception("Failed to check primary pin, reading from primary")
+            return True
+
+    async def disconnect(self):
+        """Dispose replica engines and close Redis connection"""
+        for engine in self._engines:
+            await engine.dispose()
+        self._engines = []
+        self._sessionmakers = None
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+replica_router = ReplicaRouter()
+
+
+async def pin_primary_after_write(message: Message, scope: Scope) -> None:
+    """`before_send` hook pinning users to the primary once their write succeeds
+
+    Runs before the response leaves, so a client cannot read from a replica
+    between receiving the response and the pin being set.
+    """
+    if (
+        message["type"] == "http.response.start"
+        and message["status"] < 400
+        and scope["method"] not in _SAFE_METHODS
+        and scope.get("user") is not None
+    ):
+        await replica_router.pin_primary(scope["user"].id)
+
+
+async def provide_replica_session(
+    request: Request, db_session: AsyncSession
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers: a replica unless the user is pinned"""
+    if not replica_router.enabled or await replica_router.is_pinned(request.user.id):
+        yield db_session
+        return
+    async with replica_router.session() as session:
+        yield session
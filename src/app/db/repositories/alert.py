@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+from litestar.plugins.sqlalchemy import repository
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.alert import AlertEventModel, AlertRuleModel
+from app.db.models.file import FileModel
+
+
+class AlertRuleRepository(repository.SQLAlchemyAsyncRepository[AlertRuleModel]):
+    model_type = AlertRuleModel
+
+    async def get_user_rules(
+        self, session: AsyncSession, user_id: UUID | str, enabled_only: bool = False
+    ) -> List[AlertRuleModel]:
+        stmt = select(AlertRuleModel).where(AlertRuleModel.user_id == user_id)
+        if enabled_only:
+            stmt = stmt.where(AlertRuleModel.is_enabled)
+        stmt = stmt.order_by(AlertRuleModel.created_at)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def count_user_rules(self, session: AsyncSession, user_id: UUID | str) -> int:
+        stmt = select(func.count()).where(AlertRuleModel.user_id == user_id)
+        return await session.scalar(stmt)
+
+
+class AlertEventRepository(repository.SQLAlchemyAsyncRepository[AlertEventModel]):
+    model_type = AlertEventModel
+
+    async def replace_file_events(
+        self, session: AsyncSession, file_id: UUID | str, events: list[dict]
+    ) -> None:
+        """Replace the file's events; runs in the caller's transaction (no commit)"""
+        await session.execute(
+            delete(AlertEventModel).where(AlertEventModel.file_id == file_id)
+        )
+        if events:
+            await session.execute(insert(AlertEventModel), events)
+
+    async def copy_file_events(
+        self, session: AsyncSession, source_file_id: UUID | str, file_id: UUID | str
+    ) -> int:
+        """Copy another file's events to `file_id`; no commit"""
+        events = await session.scalars(
+            select(AlertEventModel).where(AlertEventModel.file_id == source_file_id)
+        )
+        copies = [
+            {
+                "rule_id": event.rule_id,
+                "file_id": file_id,
+                "user_id": event.user_id,
+                "start_time": event.start_time,
+                "end_time": event.end_time,
+                "duration_seconds": event.duration_seconds,
+                "sample_count": event.sample_count,
+                "peak_value": event.peak_value,
+            }
+            for event in events
+        ]
+        if copies:
+            await session.execute(insert(AlertEventModel), copies)
+        return len(copies)
+
+    async def list_user_events(
+        self,
+        session: AsyncSession,
+        user_id: UUID | str,
+        rule_id: UUID | None = None,
+        file_id: UUID | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 100,
+    ) -> List[AlertEventModel]:
+        """Events of the user's current files, latest first"""
+        conditions = [AlertEventModel.user_id == user_id, ~FileModel.is_deleted]
+        if rule_id:
+            conditions.append(AlertEventModel.rule_id == rule_id)
+        if file_id:
+            conditions.append(AlertEventModel.file_id == file_id)
+        if since:
+            conditions.append(AlertEventModel.end_time >= since)
+        if until:
+            conditions.append(AlertEventModel.start_time < until)
+
+        stmt = (
+            select(AlertEventModel)
+            .join(FileModel, FileModel.id == AlertEventModel.file_id)
+            .where(and_(*conditions))
+            .order_by(AlertEventModel.start_time.desc(), AlertEventModel.id.desc())
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def provide_alert_rules_repo(db_session: AsyncSession) -> AlertRuleRepository:
+    return AlertRuleRepository(session=db_session)
+
+
+async def provide_replica_alert_events_repo(
+    replica_session: AsyncSession,
+) -> AlertEventRepository:
+    return AlertEventRepository(session=replica_session)
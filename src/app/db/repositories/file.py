@@ -1,8 +1,53 @@
+from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Optional
+from uuid import UUID
 from litestar.plugins.sqlalchemy import repository
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from app.db.models.file import FileModel
+from sqlalchemy import (
+    Row,
+    String,
+    Uuid,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    select,
+    and_,
+    tuple_,
+    update,
+    values,
+)
+from app.db.models.file import FileModel, UploadStatus
+from app.db.repositories.user import UserRepository
+
+
+# Columns of file listings, all held by idx_files_user_listing
+_LISTING_COLUMNS = (
+    FileModel.id,
+    FileModel.filename,
+    FileModel.original_filename,
+    FileModel.content_type,
+    FileModel.file_size,
+    FileModel.upload_date,
+    FileModel.uploaded_by,
+)
+
+
+@dataclass(frozen=True)
+class FileListFilters:
+    content_type: str | None = None
+    uploaded_after: datetime | None = None
+    uploaded_before: datetime | None = None
+    status: UploadStatus | None = None
+    name_contains: str | None = None
+    name_prefix: str | None = None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class FileRepository(repository.SQLAlchemyAsyncRepository[FileModel]):
@@ -18,6 +63,47 @@ class FileRepository(repository.SQLAlchemyAsyncRepository[FileModel]):
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
+    async def list_user_files(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        filters: FileListFilters,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[Row]:
+        """Listing columns of the user's files, newest first
+
+        `after` is the (upload_date, id) of the last file of the previous
+        page; seeking past it keeps every page an index range scan.
+        """
+        conditions = [FileModel.uploaded_by == user_id, ~FileModel.is_deleted]
+        if filters.content_type:
+            conditions.append(FileModel.content_type == filters.content_type)
+        if filters.uploaded_after:
+            conditions.append(FileModel.upload_date >= filters.uploaded_after)
+        if filters.uploaded_before:
+            conditions.append(FileModel.upload_date < filters.uploaded_before)
+        if filters.status:
+            conditions.append(FileModel.upload_status == filters.status)
+        if filters.name_contains:
+            pattern = f"%{_escape_like(filters.name_contains)}%"
+            conditions.append(FileModel.original_filename.ilike(pattern, escape="\\"))
+        if filters.name_prefix:
+            pattern = f"{_escape_like(filters.name_prefix)}%"
+            conditions.append(FileModel.original_filename.ilike(pattern, escape="\\"))
+        if after:
+            conditions.append(tuple_(FileModel.upload_date, FileModel.id) < after)
+
+        stmt = (
+            select(*_LISTING_COLUMNS)
+            .where(and_(*conditions))
+            .order_by(FileModel.upload_date.desc(), FileModel.id.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await session.execute(stmt)
+        return list(result.all())
+
     async def get_user_file_by_id(
         self, session: AsyncSession, file_id: str, user_id: str
     ) -> Optional[FileModel]:
@@ -31,21 +117,212 @@ class FileRepository(repository.SQLAlchemyAsyncRepository[FileModel]):
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_user_files_by_ids(
+        self, session: AsyncSession, file_ids: list[str], user_id: str
+    ) -> List[FileModel]:
+        stmt = select(FileModel).where(
+            and_(
+                FileModel.id.in_(file_ids),
+                FileModel.uploaded_by == user_id,
+                ~FileModel.is_deleted,
+            )
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_user_files_covering(
+        self, session: AsyncSession, user_id: str, since: datetime
+    ) -> List[FileModel]:
+        """Completed files whose recorded time coverage ends at or after `since`"""
+        coverage_end = FileModel.stats["time_coverage"]["end"].as_string()
+        stmt = select(FileModel).where(
+            and_(
+                FileModel.uploaded_by == user_id,
+                ~FileModel.is_deleted,
+                FileModel.upload_status == UploadStatus.COMPLETED,
+                coverage_end >= since.isoformat(),
+            )
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_pending_usage(
+        self, session: AsyncSession, user_id: str, since: datetime
+    ) -> tuple[int, int]:
+        """Return (declared bytes, count) of the user's uploads pending since `since`"""
+        stmt = select(
+            func.coalesce(func.sum(FileModel.file_size), 0), func.count()
+        ).where(
+            and_(
+                FileModel.uploaded_by == user_id,
+                ~FileModel.is_deleted,
+                FileModel.upload_status == UploadStatus.PENDING,
+                FileModel.upload_date >= since,
+            )
+        )
+        pending_bytes, pending_count = (await session.execute(stmt)).one()
+        return pending_bytes, pending_count
+
     async def get_by_s3_key(self, s3_key: str) -> Optional[FileModel]:
-        stmt = select(FileModel).where(FileModel.s3_key == s3_key)
+        # Deduplicated files share the key; the first one is the upload
+        stmt = (
+            select(FileModel)
+            .where(FileModel.s3_key == s3_key)
+            .order_by(FileModel.created_at)
+            .limit(1)
+        )
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_completed_by_checksum(
+        self, session: AsyncSession, user_id: str, checksum_sha256: str
+    ) -> Optional[FileModel]:
+        """A completed, not deleted file of the user with exactly this content
+
+        The row is share-locked until the caller's transaction ends, so its
+        S3 key cannot be moved (and the old object deleted) while a file that
+        reuses the key is being created.
+        """
+        stmt = (
+            select(FileModel)
+            .where(
+                and_(
+                    FileModel.uploaded_by == user_id,
+                    FileModel.checksum_sha256 == checksum_sha256,
+                    FileModel.upload_status == UploadStatus.COMPLETED,
+                    ~FileModel.is_deleted,
+                )
+            )
+            .order_by(FileModel.created_at)
+            .limit(1)
+            .with_for_update(read=True)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_completed_after(
+        self, session: AsyncSession, after_id: UUID | None, limit: int
+    ) -> list[Row]:
+        """IDs and keys of completed files (deleted or not) in ID order, for batched scans"""
+        stmt = select(FileModel.id, FileModel.s3_key).where(
+            FileModel.upload_status == UploadStatus.COMPLETED
+        )
+        if after_id is not None:
+            stmt = stmt.where(FileModel.id > after_id)
+        result = await session.execute(stmt.order_by(FileModel.id).limit(limit))
+        return list(result.all())
+
+    async def replace_s3_keys(
+        self, session: AsyncSession, new_keys: dict[str, str]
+    ) -> int:
+        """Point all files using one of the old keys at its new key, in one statement
+
+        `updated_at` is left alone: moving an object is not a change to the
+        file, and soft-deleted files keep their place in the purge schedule.
+        """
+        if not new_keys:
+            return 0
+        moves = values(
+            column("old_key", String), column("new_key", String), name="moves"
+        ).data(list(new_keys.items()))
+        stmt = (
+            update(FileModel)
+            .where(FileModel.s3_key == moves.c.old_key)
+            .values(s3_key=moves.c.new_key, updated_at=FileModel.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    async def get_referenced_s3_keys(
+        self, session: AsyncSession, s3_keys: set[str]
+    ) -> set[str]:
+        """The keys still used by any row, deleted or not"""
+        if not s3_keys:
+            return set()
+        return set(
+            await session.scalars(
+                select(FileModel.s3_key).where(FileModel.s3_key.in_(s3_keys)).distinct()
+            )
+        )
+
+    async def purge_deleted_files(
+        self, session: AsyncSession, deleted_before: datetime, limit: int = 1000
+    ) -> tuple[int, List[str]]:
+        """Remove rows soft-deleted before the cutoff
+
+        Returns the number of rows removed and the S3 keys left orphaned.
+
+        Deduplicated files share an object, so a key is only returned once no
+        row references it any more - deleted or not. Live files cannot gain
+        a reference to an orphaned key: deduplication only reuses objects of
+        files that are not deleted.
+        """
+        batch = (
+            select(FileModel.id)
+            .where(and_(FileModel.is_deleted, FileModel.updated_at < deleted_before))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            delete(FileModel)
+            .where(FileModel.id.in_(batch))
+            .returning(FileModel.s3_key)
+            .execution_options(synchronize_session=False)
+        )
+        purged_keys = result.scalars().all()
+        s3_keys = {key for key in purged_keys if key}
+        referenced = await self.get_referenced_s3_keys(session, s3_keys)
+        await session.commit()
+        return len(purged_keys), sorted(s3_keys - referenced)
+
+    async def soft_delete_files(
+        self, session: AsyncSession, file_ids: list[UUID], user_id: str
+    ) -> List[UUID]:
+        """Soft-delete the user's files in one statement and return the IDs found
+
+        The user's storage usage is released in the same transaction.
+        """
+        stmt = (
+            update(FileModel)
+            .where(
+                and_(
+                    FileModel.id == any_(bindparam("file_ids", type_=ARRAY(Uuid))),
+                    FileModel.uploaded_by == user_id,
+                    ~FileModel.is_deleted,
+                )
+            )
+            .values(is_deleted=True)
+            .returning(FileModel.id, FileModel.file_size, FileModel.upload_status)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt, {"file_ids": file_ids})
+        rows = result.all()
+
+        # Only completed uploads are counted towards usage
+        counted = [row for row in rows if row.upload_status == UploadStatus.COMPLETED]
+        await UserRepository(session=session).adjust_storage_usage(
+            session,
+            user_id,
+            bytes_delta=-sum(row.file_size for row in counted),
+            files_delta=-len(counted),
+        )
+        await session.commit()
+        return [row.id for row in rows]
+
     async def soft_delete_file(
         self, session: AsyncSession, file_id: str, user_id: str
     ) -> bool:
-        file_model = await self.get_user_file_by_id(session, file_id, user_id)
-        if file_model:
-            file_model.is_deleted = True
-            await session.commit()
-            return True
-        return False
+        try:
+            file_uuid = UUID(file_id)
+        except ValueError:
+            return False
+        return bool(await self.soft_delete_files(session, [file_uuid], user_id))
 
 
 async def provide_files_repo(db_session: AsyncSession) -> FileRepository:
     return FileRepository(session=db_session)
+
+
+async def provide_replica_files_repo(replica_session: AsyncSession) -> FileRepository:
+    return FileRepository(session=replica_session)
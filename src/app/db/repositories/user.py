@@ -1,11 +1,103 @@
+from uuid import UUID
 from litestar.plugins.sqlalchemy import repository
+from sqlalchemy import and_, func, or_, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.file import FileModel, UploadStatus
 from app.db.models.user import UserModel
 
+# Arbitrary key for the transaction-level advisory lock of the reconciliation job
+_RECONCILE_LOCK_KEY = 7_302_513
+
 
 class UserRepository(repository.SQLAlchemyAsyncRepository[UserModel]):
     model_type = UserModel
 
+    async def get_storage_usage(
+        self, session: AsyncSession, user_id: UUID | str
+    ) -> tuple[int, int] | None:
+        """Return (bytes used, file count) for the user"""
+        stmt = select(UserModel.storage_bytes_used, UserModel.storage_file_count).where(
+            UserModel.id == user_id
+        )
+        row = (await session.execute(stmt)).one_or_none()
+        return (row.storage_bytes_used, row.storage_file_count) if row else None
+
+    async def adjust_storage_usage(
+        self,
+        session: AsyncSession,
+        user_id: UUID | str,
+        bytes_delta: int,
+        files_delta: int,
+    ) -> None:
+        """Apply a usage delta; runs in the caller's transaction (no commit)"""
+        if not bytes_delta and not files_delta:
+            return
+        stmt = (
+            update(UserModel)
+            .where(UserModel.id == user_id)
+            .values(
+                storage_bytes_used=UserModel.storage_bytes_used + bytes_delta,
+                storage_file_count=UserModel.storage_file_count + files_delta,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(stmt)
+
+    async def reconcile_storage_usage(self, session: AsyncSession) -> int | None:
+        """Recompute usage counters from the files table, fixing any drift
+
+        Only one worker runs the reconciliation at a time; returns None when
+        another one holds the lock, otherwise the number of corrected users.
+        """
+        locked = await session.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": _RECONCILE_LOCK_KEY},
+        )
+        if not locked:
+            return None
+
+        # One aggregate pass over files; users without files aggregate to zero
+        actual = (
+            select(
+                UserModel.id.label("user_id"),
+                func.coalesce(func.sum(FileModel.file_size), 0).label("bytes_used"),
+                func.count(FileModel.id).label("file_count"),
+            )
+            .select_from(UserModel)
+            .outerjoin(
+                FileModel,
+                and_(
+                    FileModel.uploaded_by == UserModel.id,
+                    ~FileModel.is_deleted,
+                    FileModel.upload_status == UploadStatus.COMPLETED,
+                ),
+            )
+            .group_by(UserModel.id)
+            .subquery()
+        )
+        stmt = (
+            update(UserModel)
+            .where(
+                UserModel.id == actual.c.user_id,
+                or_(
+                    UserModel.storage_bytes_used != actual.c.bytes_used,
+                    UserModel.storage_file_count != actual.c.file_count,
+                ),
+            )
+            .values(
+                storage_bytes_used=actual.c.bytes_used,
+                storage_file_count=actual.c.file_count,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount
+
 
 async def provide_users_repo(db_session: AsyncSession) -> UserRepository:
     return UserRepository(session=db_session)
+
+
+async def provide_replica_users_repo(replica_session: AsyncSession) -> UserRepository:
+    return UserRepository(session=replica_session)
@@ -0,0 +1,60 @@
+import os
+
+from prometheus_client import Counter, Gauge, Histogram, multiprocess
+
+# Label values are drawn from small fixed sets (statement kinds, command and
+# operation names) so series counts stay bounded.
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements",
+    ["statement"],
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands",
+    ["command"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "redis_command_errors_total", "Failed Redis commands", ["command"]
+)
+
+S3_REQUEST_DURATION = Histogram(
+    "s3_request_duration_seconds", "Latency of S3 API calls", ["operation"]
+)
+S3_REQUEST_ERRORS = Counter(
+    "s3_request_errors_total", "Failed S3 API calls", ["operation"]
+)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "bcrypt operations queued or running",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt operation time including queueing",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the metrics shared by all workers"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,172 @@
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from types import FrameType
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+_MAX_STACK_DEPTH = 128
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _collapse(frame: FrameType | None) -> list[str]:
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _awaiting_stack(task: asyncio.Task) -> list[str]:
+    """Coroutine chain a suspended task is awaiting in, outermost first"""
+    labels = []
+    awaitable = task.get_coro()
+    while awaitable is not None and len(labels) < _MAX_STACK_DEPTH:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "ag_frame", None
+        )
+        if frame is None:
+            labels.append(type(awaitable).__qualname__)
+            break
+        labels.append(_frame_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "ag_await", None
+        )
+    return labels
+
+
+class RequestProfiler:
+    """Samples the stacks of one request's task from a background thread
+
+    The event loop interleaves many requests, so each sample checks which
+    task is running: when it is the profiled one its on-CPU stack is
+    recorded, otherwise the coroutine chain it is suspended in. The result
+    is a wall-clock profile in collapsed-stack format.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if asyncio.current_task(self._loop) is self._task:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = ["[running]", *_collapse(frame)]
+            else:
+                stack = ["[awaiting]", *_awaiting_stack(self._task)]
+            self.samples[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+async def store_profile(name: str, collapsed: str) -> str:
+    """Write collapsed stacks locally or to S3 and return where they went"""
+    config = settings.profiling
+    if config.storage == "s3":
+        # Imported lazily; S3 access is only needed when profiles go there
+        from app.services.s3_service import s3_service
+
+        s3_key = f"{config.s3_prefix.rstrip('/')}/{name}"
+        await s3_service.put_object(s3_key, collapsed.encode(), "text/plain")
+        return f"s3://{s3_service.bucket_name}/{s3_key}"
+
+    path = os.path.join(config.output_dir, name)
+
+    def write() -> None:
+        os.makedirs(config.output_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as profile_file:
+            profile_file.write(collapsed)
+
+    await asyncio.to_thread(write)
+    return path
+
+
+class ProfilingMiddleware(ASGIMiddleware):
+    """Profiles requests selected by admin header or per-route sample rate
+
+    Only added to the app when profiling is configured, so unprofiled
+    deployments pay nothing; otherwise the cost per request is a header
+    lookup and a random draw.
+    """
+
+    scopes = (ScopeType.HTTP,)
+
+    async def handle(
+        self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
+    ) -> None:
+        route = f"{scope['method']} {scope.get('path_template', scope['path'])}"
+        if not self._selected(scope, route):
+            await next_app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableScopeHeaders.from_message(message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profiler = RequestProfiler(settings.profiling.interval_seconds)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await next_app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - started
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            name = f"{timestamp}-{_UNSAFE_NAME_CHARS.sub('_', route)}-{profile_id}.collapsed"
+            try:
+                location = await store_profile(name, profiler.collapsed())
+                logger.info("Profiled %s (%.3fs) -> %s", route, elapsed, location)
+            except Exception:
+                logger.exception("Failed to store profile of %s", route)
+
+    @staticmethod
+    def _selected(scope: Scope, route: str) -> bool:
+        config = settings.profiling
+        if config.admin_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode():
+                    # Bytes: comparing str raises on non-ASCII header values
+                    return hmac.compare_digest(value, config.admin_token.encode())
+        rate = config.route_sample_rates.get(route)
+        return bool(rate) and random.random() < rate
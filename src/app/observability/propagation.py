@@ -0,0 +1,57 @@
+from typing import Optional
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+from app.observability.tracing import SpanContext, parse_traceparent, tracer
+
+# Uploads normally complete well within this; presigned URLs expire sooner
+_UPLOAD_CONTEXT_TTL_SECONDS = 60 * 60
+
+
+class UploadTraceContextStore:
+    """Carries trace context from the presign request to the S3 webhook
+
+    The upload itself goes from the client straight to S3, so the webhook
+    request carries no traceparent. The presign request's context is kept
+    in Redis under the object key and picked up again by the webhook.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.prefix = "upload_trace:"
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def save(self, s3_key: str) -> None:
+        """Remember the current trace context for the upload, if sampled"""
+        context = tracer.current_context()
+        if context is None or not context.sampled:
+            return
+        if not self.redis:
+            await self._connect()
+        await self.redis.setex(
+            f"{self.prefix}{s3_key}",
+            _UPLOAD_CONTEXT_TTL_SECONDS,
+            context.to_traceparent(),
+        )
+
+    async def pop(self, s3_key: str) -> SpanContext | None:
+        if not tracer.enabled:
+            return None
+        if not self.redis:
+            await self._connect()
+        return parse_traceparent(await self.redis.getdel(f"{self.prefix}{s3_key}"))
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+upload_trace_context_store = UploadTraceContextStore()
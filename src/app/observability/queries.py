@@ -0,0 +1,205 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists / VALUES rows differ only in their number of placeholders
+_PLACEHOLDER_LIST = re.compile(
+    r"\((?:\s*(?:\$\d+|%\(\w+\)s|\?)\s*,)+\s*(?:\$\d+|%\(\w+\)s|\?)\s*\)"
+)
+_SHAPE_LOG_LENGTH = 300
+_installed = False
+
+
+@dataclass
+class QueryStats:
+    """Statements run while tracking was active"""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    # Set once the response is sent; background work is not attributed
+    closed: bool = False
+
+    def record(self, statement: str, elapsed: float) -> None:
+        if self.closed:
+            return
+        self.count += 1
+        self.total_seconds += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Shapes run at least `threshold` times - likely N+1 patterns"""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by `query_budget` when tracked code ran too many or too slow queries"""
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_budget_observers: list["QueryBudget"] = []
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions differing only in parameters match"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(...)", shape)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_tracking_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_tracking_start"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    slow_seconds = settings.query_budget.slow_query_seconds
+    if slow_seconds and elapsed >= slow_seconds:
+        logger.warning(
+            "Slow query (%.3fs): %s",
+            elapsed,
+            statement_shape(statement)[:_SHAPE_LOG_LENGTH],
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_tracking_start"):
+        conn.info["query_tracking_start"].pop()
+
+
+def install_query_tracking() -> None:
+    """Register the statement counting events for every engine, once"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count statements run in the current context"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryBudget:
+    """Collected by `query_budget`; see there"""
+
+    def __init__(self, max_queries: int | None, max_seconds: float | None):
+        self.max_queries = max_queries
+        self.max_seconds = max_seconds
+        self.violations: list[str] = []
+
+    def check(self, label: str, stats: QueryStats) -> None:
+        if self.max_queries is not None and stats.count > self.max_queries:
+            self.violations.append(
+                f"{label}: {stats.count} queries (budget {self.max_queries})\n"
+                + _format_shapes(stats)
+            )
+        if self.max_seconds is not None and stats.total_seconds > self.max_seconds:
+            self.violations.append(
+                f"{label}: {stats.total_seconds:.3f}s in queries "
+                f"(budget {self.max_seconds}s)\n" + _format_shapes(stats)
+            )
+
+
+@contextmanager
+def query_budget(
+    max_queries: int | None = None, max_seconds: float | None = None
+) -> Iterator[QueryBudget]:
+    """Assert query budgets, e.g. in tests
+
+    Both the code run directly inside the block and every request handled
+    by the application meanwhile (such as through a test client) must stay
+    within the budget, otherwise `QueryBudgetExceeded` is raised on exit.
+    """
+    install_query_tracking()
+    budget = QueryBudget(max_queries, max_seconds)
+    _budget_observers.append(budget)
+    try:
+        with track_queries() as stats:
+            yield budget
+    finally:
+        _budget_observers.remove(budget)
+    budget.check("block", stats)
+    if budget.violations:
+        raise QueryBudgetExceeded("\n".join(budget.violations))
+
+
+def _format_shapes(stats: QueryStats, limit: int = 5) -> str:
+    return "\n".join(
+        f"  {count}x {shape[:_SHAPE_LOG_LENGTH]}"
+        for shape, count in stats.shapes.most_common(limit)
+    )
+
+
+class QueryBudgetMiddleware(ASGIMiddleware):
+    """Counts statements per request and reports requests over budget"""
+
+    scopes = (ScopeType.HTTP,)
+
+    async def handle(
+        self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
+    ) -> None:
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.body" and not message.get(
+                    "more_body", False
+                ):
+                    stats.closed = True
+                await send(message)
+
+            try:
+                await next_app(scope, receive, send_wrapper)
+            finally:
+                stats.closed = True
+                label = f"{scope['method']} {scope.get('path_template', scope['path'])}"
+                self._report(label, stats)
+
+    @staticmethod
+    def _report(label: str, stats: QueryStats) -> None:
+        config = settings.query_budget
+        if stats.count > config.max_queries or stats.total_seconds > config.max_seconds:
+            logger.warning(
+                "%s exceeded its query budget: %d queries in %.3fs\n%s",
+                label,
+                stats.count,
+                stats.total_seconds,
+                _format_shapes(stats),
+            )
+        for shape, count in stats.repeated_shapes(config.n_plus_one_threshold):
+            logger.warning(
+                "%s ran the same statement %d times (likely N+1): %s",
+                label,
+                count,
+                shape[:_SHAPE_LOG_LENGTH],
+            )
+        for budget in _budget_observers:
+            budget.check(label, stats)
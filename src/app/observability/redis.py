@@ -0,0 +1,25 @@
+import time
+from redis.asyncio import Redis
+
+from app.observability.metrics import REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS
+from app.observability.tracing import tracer
+
+
+class InstrumentedRedis(Redis):
+    """Redis client recording per-command latency, errors and trace spans"""
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        start = time.perf_counter()
+        try:
+            with tracer.span(
+                f"redis {command}", kind="client", **{"db.system": "redis"}
+            ):
+                return await super().execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels(command=command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command=command).observe(
+                time.perf_counter() - start
+            )
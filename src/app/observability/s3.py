@@ -0,0 +1,53 @@
+import time
+
+from app.observability.metrics import S3_REQUEST_DURATION, S3_REQUEST_ERRORS
+from app.observability.tracing import tracer
+
+_START_KEY = "metrics_start_time"
+_SPAN_KEY = "trace_span"
+
+
+def _before_call(model, context, **kwargs):
+    context[_START_KEY] = time.perf_counter()
+    context[_SPAN_KEY] = tracer.start_span(
+        f"s3 {model.name}", kind="client", attributes={"rpc.service": "s3"}
+    )
+
+
+def _after_call(model, http_response, parsed, context, **kwargs):
+    start = context.pop(_START_KEY, None)
+    if start is not None:
+        S3_REQUEST_DURATION.labels(operation=model.name).observe(
+            time.perf_counter() - start
+        )
+    span = context.pop(_SPAN_KEY, None)
+    if http_response is not None and http_response.status_code >= 400:
+        S3_REQUEST_ERRORS.labels(operation=model.name).inc()
+        if span is not None:
+            span.status = "error"
+    if span is not None and http_response is not None:
+        span.attributes["http.status_code"] = http_response.status_code
+    tracer.end_span(span)
+
+
+def _after_call_error(context, exception, event_name, **kwargs):
+    # No operation model is passed here; the event name ends with it
+    operation = event_name.rsplit(".", 1)[-1]
+    start = context.pop(_START_KEY, None)
+    if start is not None:
+        S3_REQUEST_DURATION.labels(operation=operation).observe(
+            time.perf_counter() - start
+        )
+    S3_REQUEST_ERRORS.labels(operation=operation).inc()
+    span = context.pop(_SPAN_KEY, None)
+    if span is not None:
+        span.set_error(exception)
+    tracer.end_span(span)
+
+
+def instrument_s3_client(s3_client) -> None:
+    """Record latency, errors and spans of every API call made with the client"""
+    events = s3_client.meta.events
+    events.register("before-call.s3", _before_call)
+    events.register("after-call.s3", _after_call)
+    events.register("after-call-error.s3", _after_call_error)
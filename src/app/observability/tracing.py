@@ -0,0 +1,299 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.observability.queries import statement_shape
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_STATEMENT_ATTRIBUTE_LENGTH = 1000
+_EXPORT_BATCH_SIZE = 512
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    def to_traceparent(self) -> str:
+        """W3C trace context header value"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: str | None) -> SpanContext | None:
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    trace_id, span_id, flags = match.groups()
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_span_id: str | None
+    kind: str = "internal"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    status: str = "ok"
+
+    def set_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)[:500]
+
+    def finish(self) -> None:
+        """Record the end time; later calls keep the first one"""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "status": self.status,
+            "attributes": self.attributes,
+            "resource": {"service.name": settings.app_name, "process.pid": os.getpid()},
+        }
+
+
+class JsonFileExporter:
+    """Appends finished spans as JSON lines from a background thread
+
+    Request paths only enqueue spans; formatting and file writes happen off
+    the event loop, in batches.
+    """
+
+    def __init__(self, path: str):
+        self.path = path.format(pid=os.getpid())
+        self._queue: queue.SimpleQueue[dict | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: dict) -> None:
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            lines = "".join(
+                json.dumps(span, default=str) + "\n" for span in batch if span
+            )
+            try:
+                with open(self.path, "a", encoding="utf-8") as trace_file:
+                    trace_file.write(lines)
+            except OSError:
+                logger.exception("Failed to write spans to %s", self.path)
+            if stop:
+                return
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Minimal tracer with parent-based ratio sampling
+
+    Spans are always created while tracing is enabled so that context is
+    propagated, but only sampled traces are exported.
+    """
+
+    def __init__(self):
+        self._exporter: JsonFileExporter | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.tracing.enabled
+
+    def current_context(self) -> SpanContext | None:
+        span = _current_span.get()
+        return span.context if span else None
+
+    def current_traceparent(self) -> str | None:
+        context = self.current_context()
+        return context.to_traceparent() if context else None
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span | None:
+        """Start a span without making it current; None when tracing is off"""
+        if not self.enabled:
+            return None
+        parent = parent or self.current_context()
+        if parent:
+            trace_id, sampled = parent.trace_id, parent.sampled
+        else:
+            trace_id = secrets.token_hex(16)
+            sampled = self._should_sample(trace_id)
+        return Span(
+            name=name,
+            context=SpanContext(trace_id, secrets.token_hex(8), sampled),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=attributes or {},
+        )
+
+    def end_span(self, span: Span | None) -> None:
+        if span is None:
+            return
+        span.finish()
+        if span.context.sampled:
+            if self._exporter is None:
+                self._exporter = JsonFileExporter(settings.tracing.file_path)
+            self._exporter.export(span.to_dict())
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: SpanContext | None = None,
+        **attributes: Any,
+    ) -> Iterator[Span | None]:
+        """Run the block in a new current span"""
+        span = self.start_span(name, kind, parent, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    @staticmethod
+    def _should_sample(trace_id: str) -> bool:
+        # Derived from the trace ID so every service makes the same decision
+        ratio = settings.tracing.sample_ratio
+        return int(trace_id[16:], 16) < ratio * (1 << 64)
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware(ASGIMiddleware):
+    """Server span per request, continuing an incoming traceparent header"""
+
+    scopes = (ScopeType.HTTP,)
+
+    async def handle(
+        self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
+    ) -> None:
+        headers = dict(scope["headers"])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        route = scope.get("path_template", scope["path"])
+        with tracer.span(
+            f"{scope['method']} {route}",
+            kind="server",
+            parent=parent,
+            **{"http.method": scope["method"], "http.route": route},
+        ) as span:
+            if span is None:
+                await next_app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                    if message["status"] >= 500:
+                        span.status = "error"
+                elif message["type"] == "http.response.body" and not message.get(
+                    "more_body", False
+                ):
+                    # Background tasks that follow stay children of this span
+                    span.finish()
+                await send(message)
+
+            await next_app(scope, receive, send_wrapper)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.start_span(
+        "db.query",
+        kind="client",
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement_shape(statement)[:_STATEMENT_ATTRIBUTE_LENGTH],
+        },
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracer.end_span(conn.info["trace_spans"].pop())
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_spans"):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            span.set_error(exception_context.original_exception)
+        tracer.end_span(span)
+
+
+_db_installed = False
+
+
+def install_db_tracing() -> None:
+    """Register statement spans for every engine, once"""
+    global _db_installed
+    if _db_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _db_installed = True
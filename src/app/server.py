@@ -1,11 +1,52 @@
+import asyncio
+import os
+
 import uvicorn
 from app.config import settings
 
 
+def _prepare_metrics_dir() -> None:
+    """Give the workers an empty directory to share their metrics through
+
+    Each worker writes its samples to files there and /metrics aggregates
+    them; files left by a previous run would be counted again.
+    """
+    path = settings.metrics.multiproc_dir
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    # Inherited by the workers, which pick their metric storage on import
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+
 def run():
+    workers = settings.api_workers or (
+        os.cpu_count() or 1 if settings.is_production else 1
+    )
+    if workers > 1 and settings.metrics.enabled:
+        _prepare_metrics_dir()
+    if workers > 1 and settings.database.create_all:
+        # Create tables once here instead of racing from every worker
+        from app.db.migrate import create_schema
+
+        asyncio.run(create_schema())
+        os.environ["DATABASE_CREATE_ALL"] = "false"
+
     uvicorn.run(
         "app.app_factory:create_app",
         host=settings.api_host,
         port=settings.api_port,
         factory=True,
+        workers=workers,
+        loop="uvloop" if settings.is_production else "auto",
+        http="httptools" if settings.is_production else "auto",
+        backlog=settings.api_backlog,
+        timeout_keep_alive=settings.api_keep_alive_seconds,
+        limit_concurrency=settings.api_limit_concurrency,
+        timeout_graceful_shutdown=settings.api_graceful_shutdown_seconds,
+        # Client addresses (e.g. for rate limits) come from X-Forwarded-For,
+        # but only when the connection is from a trusted proxy
+        proxy_headers=True,
+        forwarded_allow_ips=settings.api_forwarded_allow_ips,
     )
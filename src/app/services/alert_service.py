@@ -0,0 +1,245 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models.alert import AlertOperator, AlertRuleModel
+from app.db.repositories.alert import AlertEventRepository, AlertRuleRepository
+
+logger = logging.getLogger(__name__)
+
+_COMPARISONS = {
+    AlertOperator.GT: np.greater,
+    AlertOperator.GE: np.greater_equal,
+    AlertOperator.LT: np.less,
+    AlertOperator.LE: np.less_equal,
+}
+
+
+@dataclass
+class AlertWindow:
+    """Consecutive matching samples of one rule, times in epoch seconds"""
+
+    start: float
+    end: float
+    sample_count: int
+    peak: float
+
+
+@dataclass
+class _CompiledRule:
+    id: UUID
+    metric: str
+    compare: np.ufunc
+    threshold: float
+    min_duration_seconds: float
+    # gt/ge rules report the highest value of a window, lt/le the lowest
+    peak: np.ufunc
+
+
+class AlertRuleEvaluator:
+    """Detects the windows matching a user's rules over streamed CSV chunks
+
+    Each chunk is evaluated column-wise: one comparison per rule gives the
+    matching samples, and windows are the runs of consecutive matches,
+    found and reduced (length, time span, peak) with array operations. A
+    run still open at the end of a chunk is carried into the next one, so
+    chunk boundaries never split a window. A gap of more than
+    `max_gap_seconds` between samples, or a sample without a time, ends it.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AlertRuleModel],
+        max_gap_seconds: float,
+        max_events_per_rule: int,
+    ):
+        self.rules = [
+            _CompiledRule(
+                id=rule.id,
+                metric=rule.metric,
+                compare=_COMPARISONS[AlertOperator(rule.operator)],
+                threshold=rule.threshold,
+                min_duration_seconds=rule.min_duration_seconds,
+                peak=(
+                    np.maximum
+                    if rule.operator in (AlertOperator.GT, AlertOperator.GE)
+                    else np.minimum
+                ),
+            )
+            for rule in rules
+        ]
+        self.max_gap_seconds = max_gap_seconds
+        self.max_events_per_rule = max_events_per_rule
+        self.windows: dict[UUID, list[AlertWindow]] = {
+            rule.id: [] for rule in self.rules
+        }
+        self.dropped = 0
+        self._open: dict[UUID, AlertWindow] = {}
+        self._last_time = np.nan
+
+    def add_chunk(
+        self, timestamps: np.ndarray | None, columns: dict[str, np.ndarray]
+    ) -> None:
+        """Evaluate every rule over a chunk's epoch timestamps and numeric columns"""
+        if timestamps is None or not timestamps.size or not self.rules:
+            return
+
+        # continues[i]: sample i is close enough to the previous one to extend
+        # its window (NaN times never are)
+        previous = np.concatenate(([self._last_time], timestamps[:-1]))
+        delta = timestamps - previous
+        continues = (delta >= 0) & (delta <= self.max_gap_seconds)
+        has_time = np.isfinite(timestamps)
+        self._last_time = timestamps[-1]
+
+        for rule in self.rules:
+            values = columns.get(rule.metric)
+            if values is None:
+                continue
+            with np.errstate(invalid="ignore"):
+                matches = rule.compare(values, rule.threshold) & has_time
+            self._scan(rule, matches, continues, timestamps, values)
+
+    def _scan(
+        self,
+        rule: _CompiledRule,
+        matches: np.ndarray,
+        continues: np.ndarray,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+    ) -> None:
+        open_window = self._open.pop(rule.id, None)
+        previous_matches = np.concatenate(([open_window is not None], matches[:-1]))
+        starts = matches & ~(previous_matches & continues)
+
+        indices = np.flatnonzero(matches)
+        if not indices.size:
+            if open_window:
+                self._finish(rule, open_window)
+            return
+
+        # Work on the matching samples only; each run is a contiguous segment
+        times = timestamps[indices]
+        boundaries = np.flatnonzero(starts[indices])
+        extends_open = open_window is not None and not starts[indices[0]]
+        if extends_open:
+            boundaries = np.concatenate(([0], boundaries))
+        elif open_window:
+            self._finish(rule, open_window)
+
+        ends = np.append(boundaries[1:], indices.size) - 1
+        run_starts = times[boundaries]
+        run_ends = times[ends]
+        counts = ends - boundaries + 1
+        peaks = rule.peak.reduceat(values[indices], boundaries)
+
+        if extends_open:
+            open_window.end = float(run_ends[0])
+            open_window.sample_count += int(counts[0])
+            open_window.peak = float(rule.peak(open_window.peak, peaks[0]))
+            run_starts[0] = open_window.start
+            counts[0] = open_window.sample_count
+            peaks[0] = open_window.peak
+
+        # The last run stays open when it reaches the end of the chunk
+        last = len(boundaries) - 1
+        if indices[-1] == matches.size - 1:
+            self._open[rule.id] = AlertWindow(
+                start=float(run_starts[last]),
+                end=float(run_ends[last]),
+                sample_count=int(counts[last]),
+                peak=float(peaks[last]),
+            )
+            last -= 1
+
+        durations = run_ends[: last + 1] - run_starts[: last + 1]
+        long_enough = np.flatnonzero(durations >= rule.min_duration_seconds)
+        for i in long_enough:
+            self._emit(
+                rule,
+                AlertWindow(
+                    start=float(run_starts[i]),
+                    end=float(run_ends[i]),
+                    sample_count=int(counts[i]),
+                    peak=float(peaks[i]),
+                ),
+            )
+
+    def _finish(self, rule: _CompiledRule, window: AlertWindow) -> None:
+        if window.end - window.start >= rule.min_duration_seconds:
+            self._emit(rule, window)
+
+    def _emit(self, rule: _CompiledRule, window: AlertWindow) -> None:
+        windows = self.windows[rule.id]
+        if len(windows) < self.max_events_per_rule:
+            windows.append(window)
+        else:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """End the windows still open after the last chunk"""
+        for rule in self.rules:
+            open_window = self._open.pop(rule.id, None)
+            if open_window:
+                self._finish(rule, open_window)
+
+
+class AlertService:
+    """Loads a user's alert rules and stores the events detected in their files"""
+
+    async def create_evaluator(
+        self, session: AsyncSession, user_id: UUID | str
+    ) -> AlertRuleEvaluator | None:
+        """Evaluator for the user's enabled rules, or None when there are none"""
+        rules = await AlertRuleRepository(session=session).get_user_rules(
+            session, user_id, enabled_only=True
+        )
+        if not rules:
+            return None
+        return AlertRuleEvaluator(
+            rules,
+            max_gap_seconds=settings.alert.max_gap_seconds,
+            max_events_per_rule=settings.alert.max_events_per_file,
+        )
+
+    async def save_events(
+        self,
+        session: AsyncSession,
+        file_id: UUID,
+        user_id: UUID | str,
+        evaluator: AlertRuleEvaluator,
+    ) -> int:
+        """Replace the file's events with the evaluator's; return how many (no commit)"""
+        if evaluator.dropped:
+            logger.warning(
+                "Dropped %d alert events of file %s over the per-rule limit",
+                evaluator.dropped,
+                file_id,
+            )
+        events = [
+            {
+                "rule_id": rule_id,
+                "file_id": file_id,
+                "user_id": user_id,
+                "start_time": datetime.fromtimestamp(window.start, timezone.utc),
+                "end_time": datetime.fromtimestamp(window.end, timezone.utc),
+                "duration_seconds": window.end - window.start,
+                "sample_count": window.sample_count,
+                "peak_value": window.peak,
+            }
+            for rule_id, windows in evaluator.windows.items()
+            for window in windows
+        ]
+        await AlertEventRepository(session=session).replace_file_events(
+            session, file_id, events
+        )
+        return len(events)
+
+
+alert_service = AlertService()
@@ -0,0 +1,229 @@
+import codecs
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+_CANDIDATE_DELIMITERS = ",;\t|"
+_FALLBACK_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+_UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+_CSV_CONTENT_TYPES = ("text/csv", "application/csv", "text/plain")
+_TIME_COLUMN_NAMES = ("timestamp", "time", "datetime", "date", "ts")
+# Epoch values above this are assumed to be milliseconds rather than seconds
+_EPOCH_MILLIS_THRESHOLD = 1e11
+
+
+@dataclass
+class CsvPreview:
+    encoding: str
+    delimiter: str
+    header: list[str] = field(default_factory=list)
+    rows: list[list[str]] = field(default_factory=list)
+    truncated: bool = False
+
+
+def _trim_partial_line(data: bytes) -> bytes:
+    """Drop everything after the last newline (the row cut by a ranged read)"""
+    last_newline = data.rfind(b"\n")
+    if last_newline == -1:
+        return data
+    return data[: last_newline + 1]
+
+
+def detect_encoding(data: bytes) -> str:
+    """Detect the text encoding of a file sample from its BOM or by trial decoding"""
+    if data.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if data.startswith(_UTF16_BOMS):
+        return "utf-16"
+
+    for encoding in _FALLBACK_ENCODINGS:
+        try:
+            data.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def detect_delimiter(sample: str) -> str:
+    """Detect the CSV delimiter, defaulting to a comma"""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=_CANDIDATE_DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def parse_preview(data: bytes, max_rows: int, truncated: bool) -> CsvPreview:
+    """Parse the header and first rows out of the leading bytes of a CSV file
+
+    When `truncated` is set the data came from a ranged read, so the last
+    (possibly partial) row is discarded.
+    """
+    is_utf16 = data.startswith(_UTF16_BOMS)
+    if truncated and not is_utf16:
+        data = _trim_partial_line(data)
+
+    encoding = detect_encoding(data)
+    text = data.decode(encoding, errors="replace")
+    if truncated and is_utf16:
+        # A UTF-16 newline is two bytes wide, so trim on the decoded text instead
+        text = text[: text.rfind("\n") + 1] or text
+
+    delimiter = detect_delimiter(text)
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+
+    header = next(reader, [])
+    rows = []
+    for row in reader:
+        if len(rows) >= max_rows:
+            break
+        if row:
+            rows.append(row)
+
+    return CsvPreview(
+        encoding=encoding,
+        delimiter=delimiter,
+        header=header,
+        rows=rows,
+        truncated=truncated,
+    )
+
+
+def is_csv_file(content_type: str, filename: str) -> bool:
+    return content_type.split(";")[0].strip().lower() in _CSV_CONTENT_TYPES or (
+        filename.lower().endswith((".csv", ".tsv"))
+    )
+
+
+def find_time_column(header: list[str]) -> int | None:
+    """Return the index of the column that most likely holds sample timestamps"""
+    normalized = [name.strip().lower() for name in header]
+    for candidate in _TIME_COLUMN_NAMES:
+        if candidate in normalized:
+            return normalized.index(candidate)
+    for index, name in enumerate(normalized):
+        if "time" in name or "date" in name:
+            return index
+    return None
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def to_float_array(values: np.ndarray) -> np.ndarray:
+    """Convert a string column to float64, mapping blanks and text to NaN"""
+    stripped = np.char.strip(values)
+    try:
+        return np.where(stripped == "", "nan", stripped).astype(np.float64)
+    except ValueError:
+        # Mixed column: fall back to per-value parsing for this chunk only
+        return np.fromiter(
+            (_parse_float(value) for value in stripped),
+            dtype=np.float64,
+            count=stripped.size,
+        )
+
+
+def _parse_datetime(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return np.nan
+
+
+def to_epoch_seconds(values: np.ndarray) -> np.ndarray:
+    """Convert a timestamp column (epoch seconds/millis or ISO 8601) to epoch seconds"""
+    stripped = np.char.strip(values)
+    numeric = to_float_array(stripped)
+    finite = numeric[np.isfinite(numeric)]
+    if finite.size:
+        if np.median(finite) > _EPOCH_MILLIS_THRESHOLD:
+            return numeric / 1000.0
+        return numeric
+
+    try:
+        parsed = np.where(stripped == "", "NaT", stripped).astype("datetime64[ms]")
+        seconds = parsed.astype(np.int64).astype(np.float64) / 1000.0
+        seconds[np.isnat(parsed)] = np.nan
+        return seconds
+    except ValueError:
+        # Timezone-aware or otherwise non-numpy formats
+        return np.fromiter(
+            (_parse_datetime(value) for value in stripped),
+            dtype=np.float64,
+            count=stripped.size,
+        )
+
+
+@dataclass
+class CsvChunk:
+    header: list[str]
+    columns: list[np.ndarray]
+
+    @property
+    def row_count(self) -> int:
+        return self.columns[0].size if self.columns else 0
+
+
+class CsvChunkParser:
+    """Incrementally parses streamed CSV bytes into per-column NumPy arrays
+
+    Encoding and delimiter are detected from the first chunk. Rows split
+    across chunk boundaries are carried over to the next `feed` call.
+    """
+
+    def __init__(self):
+        self.encoding: str | None = None
+        self.delimiter: str | None = None
+        self.header: list[str] | None = None
+        self._decoder: codecs.IncrementalDecoder | None = None
+        self._pending = ""
+
+    def feed(self, data: bytes) -> CsvChunk | None:
+        if self._decoder is None:
+            self.encoding = detect_encoding(_trim_partial_line(data))
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(
+                errors="replace"
+            )
+
+        text = self._pending + self._decoder.decode(data)
+        last_newline = text.rfind("\n")
+        if last_newline == -1:
+            self._pending = text
+            return None
+        self._pending = text[last_newline + 1 :]
+        return self._parse(text[: last_newline + 1])
+
+    def close(self) -> CsvChunk | None:
+        if self._decoder is None:
+            return None
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return self._parse(text) if text.strip() else None
+
+    def _parse(self, text: str) -> CsvChunk | None:
+        if self.delimiter is None:
+            self.delimiter = detect_delimiter(text[:8192])
+
+        reader = csv.reader(io.StringIO(text), delimiter=self.delimiter)
+        if self.header is None:
+            self.header = [name.strip() for name in next(reader, [])]
+
+        width = len(self.header)
+        rows = [
+            row[:width] if len(row) >= width else row + [""] * (width - len(row))
+            for row in reader
+            if row
+        ]
+        if not rows or not width:
+            return None
+
+        table = np.array(rows, dtype=np.str_)
+        return CsvChunk(header=self.header, columns=list(table.T))
@@ -0,0 +1,288 @@
+import asyncio
+import io
+import logging
+import time
+import uuid
+import zipfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Optional
+from litestar import Litestar
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+from app.observability.tracing import tracer
+from app.services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+_EXPORT_JOB_TTL_SECONDS = 24 * 60 * 60
+# Archives are deleted once their job expired, checked at this interval
+_ARCHIVE_PURGE_INTERVAL_SECONDS = 15 * 60
+# S3 DeleteObjects accepts at most 1000 keys
+_ARCHIVE_PURGE_BATCH_SIZE = 1000
+
+
+class ExportJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class ExportEntry:
+    s3_key: str
+    filename: str
+    upload_date: datetime
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only, unseekable sink so zipfile streams entries with data descriptors"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _archive_name(filename: str) -> str:
+    """The file name without any directory or drive part"""
+    name = PurePosixPath(filename.replace("\\", "/").replace(":", "/")).name
+    return name if name not in ("", ".", "..") else "file"
+
+
+def _unique_names(entries: list[ExportEntry]) -> list[str]:
+    """Archive member names, numbered where they would repeat
+
+    Names are compared case-insensitively, since archives are often
+    extracted on case-insensitive file systems.
+    """
+    used: set[str] = set()
+    names = []
+    for entry in entries:
+        name = _archive_name(entry.filename)
+        path = PurePosixPath(name)
+        count = 0
+        while name.lower() in used:
+            count += 1
+            name = f"{path.stem} ({count}){path.suffix}"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+class FileExportService:
+    """Zip export of a user's files streamed to S3, with job status in Redis"""
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.prefix = "export_job:"
+        # Per user, the IDs of their live jobs scored by expiry time
+        self.user_prefix = "export_jobs:"
+        # S3 keys of all archives, scored by the expiry time of their job
+        self.archives_key = "export_archives"
+        self._purge_task: asyncio.Task | None = None
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def create_job(self, user_id: str, file_count: int) -> str | None:
+        """Register a new export job and return its ID
+
+        Returns None when the user already holds as many live exports
+        (running, or with an archive not expired yet) as allowed.
+        """
+        if not self.redis:
+            await self._connect()
+
+        job_id = uuid.uuid4().hex
+        user_key = f"{self.user_prefix}{user_id}"
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(user_key, "-inf", now)
+            pipe.zadd(user_key, {job_id: now + _EXPORT_JOB_TTL_SECONDS})
+            pipe.expire(user_key, _EXPORT_JOB_TTL_SECONDS)
+            pipe.zcard(user_key)
+            *_, live_jobs = await pipe.execute()
+        if live_jobs > settings.storage_quota.max_exports_per_user:
+            await self.redis.zrem(user_key, job_id)
+            return None
+
+        await self._update_job(
+            job_id,
+            user_id=str(user_id),
+            status=ExportJobStatus.PENDING,
+            file_count=file_count,
+            created_at=datetime.utcnow().isoformat(),
+            # Lets the job's spans be found from its status record
+            traceparent=tracer.current_traceparent() or "",
+        )
+        return job_id
+
+    async def get_job(self, job_id: str, user_id: str) -> dict[str, str] | None:
+        """Get job data if it exists and belongs to the user"""
+        if not self.redis:
+            await self._connect()
+
+        job = await self.redis.hgetall(f"{self.prefix}{job_id}")
+        if not job or job.get("user_id") != str(user_id):
+            return None
+        return job
+
+    async def _update_job(self, job_id: str, **fields) -> None:
+        key = f"{self.prefix}{job_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={k: str(v) for k, v in fields.items()})
+            pipe.expire(key, _EXPORT_JOB_TTL_SECONDS)
+            await pipe.execute()
+
+    async def iter_zip(self, entries: list[ExportEntry]) -> AsyncIterator[bytes]:
+        """Generate a zip archive of the objects on the fly
+
+        Only the compressed bytes produced since the last yield are held in
+        memory, so the archive size is not bounded by available memory.
+        """
+        sink = _ZipStreamBuffer()
+        with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+            for entry, name in zip(entries, _unique_names(entries)):
+                info = zipfile.ZipInfo(name, entry.upload_date.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with archive.open(info, mode="w", force_zip64=True) as member:
+                    async for chunk in s3_service.iter_object_chunks(entry.s3_key):
+                        await asyncio.to_thread(member.write, chunk)
+                        if data := sink.drain():
+                            yield data
+                if data := sink.drain():
+                    yield data
+        if data := sink.drain():
+            yield data
+
+    async def run_export(
+        self, job_id: str, user_id: str, entries: list[ExportEntry]
+    ) -> None:
+        """Build the archive and upload it to S3 with a multipart upload"""
+        if not self.redis:
+            await self._connect()
+
+        await self._update_job(job_id, status=ExportJobStatus.RUNNING)
+        try:
+            with tracer.span("export.run", **{"export.job_id": job_id}):
+                s3_key, archive_size = await s3_service.upload_stream(
+                    self.iter_zip(entries),
+                    file_id=f"export-{job_id}",
+                    user_id=str(user_id),
+                    original_filename=f"export-{job_id}.zip",
+                    content_type="application/zip",
+                )
+        except Exception:
+            logger.exception("Export job %s failed", job_id)
+            await self._update_job(
+                job_id, status=ExportJobStatus.FAILED, error="Export failed"
+            )
+            # Nothing is stored; the user may start another export
+            await self.redis.zrem(f"{self.user_prefix}{user_id}", job_id)
+            return
+
+        await self.redis.zadd(
+            self.archives_key, {s3_key: time.time() + _EXPORT_JOB_TTL_SECONDS}
+        )
+        await self._update_job(
+            job_id,
+            status=ExportJobStatus.COMPLETED,
+            s3_key=s3_key,
+            archive_size=archive_size,
+            completed_at=datetime.utcnow().isoformat(),
+        )
+
+    async def purge_expired_archives(self) -> int:
+        """Delete the archives of expired jobs; return how many were deleted"""
+        if not self.redis:
+            await self._connect()
+
+        purged = 0
+        while True:
+            s3_keys = await self.redis.zrangebyscore(
+                self.archives_key,
+                "-inf",
+                time.time(),
+                start=0,
+                num=_ARCHIVE_PURGE_BATCH_SIZE,
+            )
+            if not s3_keys:
+                return purged
+
+            # Claim the keys so that only one worker deletes each archive
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for s3_key in s3_keys:
+                    pipe.zrem(self.archives_key, s3_key)
+                claimed = [
+                    s3_key
+                    for s3_key, removed in zip(s3_keys, await pipe.execute())
+                    if removed
+                ]
+            if not claimed:
+                continue
+
+            failed = await s3_service.delete_files(claimed)
+            if failed:
+                logger.error(
+                    "Failed to delete %d export archives, e.g. %s",
+                    len(failed),
+                    failed[0],
+                )
+                # Retried on the next run
+                await self.redis.zadd(
+                    self.archives_key,
+                    {
+                        s3_key: time.time() + _ARCHIVE_PURGE_INTERVAL_SECONDS
+                        for s3_key in failed
+                    },
+                )
+            purged += len(claimed) - len(failed)
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(_ARCHIVE_PURGE_INTERVAL_SECONDS)
+            try:
+                purged = await self.purge_expired_archives()
+                if purged:
+                    logger.info("Deleted %d expired export archives", purged)
+            except Exception:
+                logger.exception("Export archive purge failed")
+
+    @asynccontextmanager
+    async def lifespan(self, app: Litestar) -> AsyncIterator[None]:
+        """Delete expired archives for the lifetime of the application"""
+        self._purge_task = asyncio.create_task(self._purge_periodically())
+        try:
+            yield
+        finally:
+            self._purge_task.cancel()
+            self._purge_task = None
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+file_export_service = FileExportService()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+
+_LISTING_TTL_SECONDS = 10 * 60
+_LOCK_TTL_MILLISECONDS = 5000
+_LOCK_POLL_SECONDS = 0.05
+
+
+class FileListingCacheService:
+    """Read-through Redis cache of file listings, invalidated by version bumps
+
+    Cached pages are keyed by a per-user version counter. Any change to a
+    user's files bumps the counter, so stale pages are simply never read
+    again and expire on their own - no key scans are needed.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.version_prefix = "files_version:"
+        self.listing_prefix = "files_listing:"
+        self.lock_prefix = "files_listing_lock:"
+        self._local_locks: dict[str, asyncio.Lock] = {}
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def get_version(self, user_id: UUID | str) -> str:
+        """Current listing version for the user"""
+        if not self.redis:
+            await self._connect()
+
+        key = f"{self.version_prefix}{user_id}"
+        version = await self.redis.get(key)
+        if version is None:
+            # Seed from the clock so a lost counter never reuses an old version
+            await self.redis.set(key, time.time_ns(), nx=True)
+            version = await self.redis.get(key)
+        return version
+
+    async def bump_version(self, user_id: UUID | str) -> None:
+        """Invalidate every cached listing page of the user in O(1)"""
+        if not self.redis:
+            await self._connect()
+
+        key = f"{self.version_prefix}{user_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.incr(key)
+            await pipe.execute()
+
+    async def get_or_load(
+        self,
+        user_id: UUID | str,
+        page_key: str,
+        loader: Callable[[], Awaitable[str]],
+        version: str | None = None,
+    ) -> str:
+        """Return the cached listing page, loading it at most once on a miss
+
+        Concurrent misses for the same page wait for a single loader: an
+        asyncio lock collapses them within this worker and a short-lived
+        Redis lock collapses them across workers. Callers that already
+        read the version (e.g. to build an ETag) can pass it in.
+        """
+        if version is None:
+            version = await self.get_version(user_id)
+        cache_key = f"{self.listing_prefix}{user_id}:{version}:{page_key}"
+
+        cached = await self.redis.get(cache_key)
+        if cached is not None:
+            return cached
+
+        local_lock = self._local_locks.setdefault(cache_key, asyncio.Lock())
+        try:
+            async with local_lock:
+                cached = await self.redis.get(cache_key)
+                if cached is not None:
+                    return cached
+                return await self._load_with_lock(cache_key, loader)
+        finally:
+            if not local_lock.locked():
+                self._local_locks.pop(cache_key, None)
+
+    async def _load_with_lock(
+        self, cache_key: str, loader: Callable[[], Awaitable[str]]
+    ) -> str:
+        lock_key = f"{self.lock_prefix}{cache_key}"
+        acquired = await self.redis.set(lock_key, 1, nx=True, px=_LOCK_TTL_MILLISECONDS)
+        if not acquired:
+            # Another worker is loading this page; wait for its result
+            deadline = time.monotonic() + _LOCK_TTL_MILLISECONDS / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_LOCK_POLL_SECONDS)
+                cached = await self.redis.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        try:
+            value = await loader()
+            await self.redis.setex(cache_key, _LISTING_TTL_SECONDS, value)
+            return value
+        finally:
+            if acquired:
+                await self.redis.delete(lock_key)
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+file_listing_cache_service = FileListingCacheService()
@@ -0,0 +1,70 @@
+import json
+from dataclasses import asdict
+from typing import Optional
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+from app.services.csv_utils import CsvPreview, parse_preview
+from app.services.s3_service import s3_service
+
+# Enough for a header plus the maximum number of preview rows of typical sensor CSVs
+PREVIEW_RANGE_BYTES = 64 * 1024
+PREVIEW_MAX_ROWS = 100
+_PREVIEW_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+class FilePreviewService:
+    """CSV preview built from a single ranged S3 read, cached in Redis by ETag"""
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.prefix = "file_preview:"
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    def _cache_key(self, s3_key: str, etag: str) -> str:
+        return f"{self.prefix}{s3_key}:{etag}"
+
+    async def get_preview(self, s3_key: str, etag: str | None = None) -> CsvPreview:
+        """Return the preview of an object, reading S3 only on a cache miss
+
+        The ETag stored from the upload webhook lets a cache hit skip S3
+        entirely; objects without a known ETag are cached under the ETag
+        returned by the ranged read.
+        """
+        if not self.redis:
+            await self._connect()
+
+        if etag:
+            cached = await self.redis.get(self._cache_key(s3_key, etag))
+            if cached:
+                return CsvPreview(**json.loads(cached))
+
+        data, object_etag, total_size = await s3_service.get_object_range(
+            s3_key, 0, PREVIEW_RANGE_BYTES - 1
+        )
+        truncated = total_size is not None and total_size > len(data)
+        preview = parse_preview(data, PREVIEW_MAX_ROWS, truncated)
+
+        cache_etag = object_etag or etag
+        if cache_etag:
+            await self.redis.setex(
+                self._cache_key(s3_key, cache_etag),
+                _PREVIEW_CACHE_TTL_SECONDS,
+                json.dumps(asdict(preview)),
+            )
+        return preview
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+file_preview_service = FilePreviewService()
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import numpy as np
+
+from app.db.config import db_config
+from app.db.replicas import replica_router
+from app.db.models.file import FileModel, UploadStatus
+from app.services.alert_service import AlertRuleEvaluator, alert_service
+from app.services.csv_utils import (
+    CsvChunk,
+    CsvChunkParser,
+    find_time_column,
+    is_csv_file,
+    to_epoch_seconds,
+    to_float_array,
+)
+from app.services.readings_cache_service import readings_cache_service
+from app.services.s3_service import s3_service
+from app.services.upload_events_service import upload_events_service
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the file between two ingest progress events
+_PROGRESS_STEP = 0.1
+
+
+@dataclass
+class ColumnAccumulator:
+    """Running column statistics, merged chunk by chunk (Chan/Welford update)"""
+
+    count: int = 0
+    null_count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        finite = values[np.isfinite(values)]
+        self.null_count += values.size - finite.size
+        n = finite.size
+        if not n:
+            return
+
+        chunk_mean = float(finite.mean())
+        chunk_m2 = float(np.square(finite - chunk_mean).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.minimum = min(self.minimum, float(finite.min()))
+        self.maximum = max(self.maximum, float(finite.max()))
+
+    def to_dict(self) -> dict:
+        if not self.count:
+            return {"count": 0, "null_count": self.null_count}
+        stddev = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.mean,
+            "stddev": stddev,
+        }
+
+
+class FileStatsBuilder:
+    """Accumulates per-column statistics and time coverage over CSV chunks"""
+
+    def __init__(self):
+        self.row_count = 0
+        self.time_column: str | None = None
+        self.columns: dict[str, ColumnAccumulator] = {}
+        self.time_start = math.inf
+        self.time_end = -math.inf
+
+    def add_chunk(
+        self, chunk: CsvChunk
+    ) -> tuple[np.ndarray | None, dict[str, np.ndarray]]:
+        """Add a chunk; return its epoch timestamps and numeric columns for reuse"""
+        if not self.columns:
+            time_index = find_time_column(chunk.header)
+            if time_index is not None:
+                self.time_column = chunk.header[time_index]
+            self.columns = {
+                name: ColumnAccumulator()
+                for name in chunk.header
+                if name != self.time_column
+            }
+
+        self.row_count += chunk.row_count
+        timestamps = None
+        numeric = {}
+        for name, values in zip(chunk.header, chunk.columns):
+            if name == self.time_column:
+                timestamps = to_epoch_seconds(values)
+                finite = timestamps[np.isfinite(timestamps)]
+                if finite.size:
+                    self.time_start = min(self.time_start, float(finite.min()))
+                    self.time_end = max(self.time_end, float(finite.max()))
+            else:
+                numeric[name] = to_float_array(values)
+                self.columns[name].update(numeric[name])
+        return timestamps, numeric
+
+    def to_dict(self) -> dict:
+        time_coverage = None
+        if self.time_column and self.time_start <= self.time_end:
+            time_coverage = {
+                "column": self.time_column,
+                "start": datetime.fromtimestamp(self.time_start, timezone.utc),
+                "end": datetime.fromtimestamp(self.time_end, timezone.utc),
+                "duration_seconds": self.time_end - self.time_start,
+            }
+        return {
+            "row_count": self.row_count,
+            "columns": {
+                name: accumulator.to_dict()
+                for name, accumulator in self.columns.items()
+            },
+            "time_coverage": time_coverage,
+        }
+
+
+class FileProcessingService:
+    """Post-upload processing of completed files, run outside the request cycle"""
+
+    async def compute_stats(
+        self,
+        s3_key: str,
+        on_progress: Callable[[int], Awaitable[None]] | None = None,
+        evaluator: AlertRuleEvaluator | None = None,
+    ) -> dict:
+        """Compute per-column statistics in a single streaming pass over the object
+
+        `on_progress` is awaited with the number of bytes consumed so far.
+        Alert rules of `evaluator` are evaluated in the same pass.
+        """
+        parser = CsvChunkParser()
+        builder = FileStatsBuilder()
+        bytes_read = 0
+
+        def consume(data: bytes | None) -> None:
+            chunk = parser.feed(data) if data is not None else parser.close()
+            if chunk is not None:
+                timestamps, columns = builder.add_chunk(chunk)
+                if evaluator:
+                    evaluator.add_chunk(timestamps, columns)
+
+        async for data in s3_service.iter_object_chunks(s3_key):
+            # Parsing and reductions are CPU bound; keep them off the event loop
+            await asyncio.to_thread(consume, data)
+            bytes_read += len(data)
+            if on_progress:
+                await on_progress(bytes_read)
+        await asyncio.to_thread(consume, None)
+        if evaluator:
+            evaluator.close()
+
+        return builder.to_dict()
+
+    async def process_file(self, file_id: UUID) -> None:
+        """Compute and store statistics for a completed CSV upload
+
+        No database connection is held while the object is streamed, which
+        can take minutes for large files.
+        """
+        async with db_config.get_session() as session:
+            file = await session.get(FileModel, file_id)
+            if not file or file.upload_status != UploadStatus.COMPLETED:
+                return
+            if not is_csv_file(file.content_type, file.original_filename):
+                return
+
+            user_id = file.uploaded_by
+            file_size = file.file_size
+            s3_key = file.s3_key
+            evaluator = await alert_service.create_evaluator(session, user_id)
+
+        reported = 0.0
+
+        async def report_progress(bytes_read: int) -> None:
+            nonlocal reported
+            progress = min(bytes_read / file_size, 1.0) if file_size else 1.0
+            if progress - reported >= _PROGRESS_STEP:
+                reported = progress
+                await upload_events_service.publish(
+                    user_id,
+                    "ingest_progress",
+                    file_id=file_id,
+                    state="running",
+                    progress=round(progress, 2),
+                )
+
+        state = "completed"
+        try:
+            stats = await self.compute_stats(s3_key, report_progress, evaluator)
+        except Exception:
+            logger.exception("Failed to compute statistics for file %s", file_id)
+            stats = {"error": "Statistics could not be computed"}
+            state = "failed"
+
+        alert_events = None
+        async with db_config.get_session() as session:
+            file = await session.get(FileModel, file_id)
+            if not file:
+                return
+            if evaluator and state == "completed":
+                alert_events = await alert_service.save_events(
+                    session, file_id, user_id, evaluator
+                )
+            file.stats = _to_json(stats)
+            await session.commit()
+
+        # Clients react to the event below by reading the stats and alert
+        # events; keep those reads off replicas that may not have them yet
+        await replica_router.pin_primary(user_id)
+
+        await upload_events_service.publish(
+            user_id,
+            "ingest_progress",
+            file_id=file_id,
+            state=state,
+            progress=1.0,
+            alert_events=alert_events,
+        )
+
+        # New readings may fall into the cached window for this user
+        await readings_cache_service.invalidate_user(user_id)
+
+
+def _to_json(value):
+    """Make datetimes JSON serializable for the JSON column"""
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+file_processing_service = FileProcessingService()
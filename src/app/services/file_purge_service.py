@@ -0,0 +1,68 @@
+"""Permanent removal of soft-deleted files, run periodically (e.g. from cron)
+
+uv run purge-files --retention-days 30
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.db.config import db_config
+from app.db.repositories.file import FileRepository
+from app.services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+# S3 DeleteObjects accepts at most 1000 keys
+_BATCH_SIZE = 1000
+
+
+class FilePurgeService:
+    """Deletes file rows past their retention and the objects no row uses any more"""
+
+    async def purge(self, retention: timedelta) -> tuple[int, int]:
+        """Return the number of rows and of S3 objects removed"""
+        deleted_before = datetime.now(timezone.utc) - retention
+        purged_rows = purged_objects = 0
+        while True:
+            async with db_config.get_session() as session:
+                purged, s3_keys = await FileRepository(
+                    session=session
+                ).purge_deleted_files(session, deleted_before, limit=_BATCH_SIZE)
+            purged_rows += purged
+            if s3_keys:
+                failed = await s3_service.delete_files(s3_keys)
+                if failed:
+                    logger.error(
+                        "Failed to delete %d orphaned objects, e.g. %s",
+                        len(failed),
+                        failed[0],
+                    )
+                purged_objects += len(s3_keys) - len(failed)
+            if purged < _BATCH_SIZE:
+                return purged_rows, purged_objects
+
+
+file_purge_service = FilePurgeService()
+
+
+async def _purge(retention: timedelta) -> tuple[int, int]:
+    try:
+        return await file_purge_service.purge(retention)
+    finally:
+        await db_config.get_engine().dispose()
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Purge soft-deleted files")
+    parser.add_argument("--retention-days", type=float, default=30)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows, objects = asyncio.run(_purge(timedelta(days=args.retention_days)))
+    logger.info("Purged %d files and %d S3 objects", rows, objects)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,9 +1,29 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 import bcrypt
 
+from app.observability.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE_DEPTH,
+)
+
+T = TypeVar("T")
+
 
 class PasswordService:
     """Simple password hashing service using bcrypt"""
 
+    def __init__(self):
+        # bcrypt releases the GIL, so hashing runs in parallel on this pool
+        # while the event loop keeps serving other requests
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt"
+        )
+
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash password using bcrypt with salt rounds=12"""
@@ -15,6 +35,26 @@ class PasswordService:
         """Verify password against bcrypt hash"""
         return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
+    async def hash_password_async(self, password: str) -> str:
+        """Hash password on the bcrypt worker pool"""
+        return await self._run("hash", self.hash_password, password)
+
+    async def verify_password_async(self, password: str, hashed: str) -> bool:
+        """Verify password on the bcrypt worker pool"""
+        return await self._run("verify", self.verify_password, password, hashed)
+
+    async def _run(self, operation: str, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_DURATION.labels(operation=operation).observe(
+                time.perf_counter() - start
+            )
+
 
 # TODO: Add password validation policy
 # - Minimum 8 characters
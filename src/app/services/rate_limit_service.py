@@ -0,0 +1,160 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+from litestar.exceptions import TooManyRequestsException
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+
+logger = logging.getLogger(__name__)
+
+# Checks every bucket first and only takes a token from all of them when
+# none is empty, so a rejected attempt does not drain the other buckets.
+# ARGV holds (capacity, tokens per millisecond) for each key. Returns the
+# wait in milliseconds per key, all zeros when the attempt is admitted.
+_TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tokens = {}
+local waits = {}
+local rejected = false
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(bucket[1]) or capacity
+    local last = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - last) * rate)
+    tokens[i] = available
+    waits[i] = 0
+    if available < 1 then
+        waits[i] = math.ceil((1 - available) / rate)
+        rejected = true
+    end
+end
+if not rejected then
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[2 * i - 1])
+        local rate = tonumber(ARGV[2 * i])
+        redis.call('HSET', key, 'tokens', tostring(tokens[i] - 1), 'ts', now)
+        redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+    end
+end
+return waits
+"""
+
+# Bound on locally remembered blocked keys
+_MAX_LOCAL_BLOCKS = 10000
+
+
+@dataclass
+class _Bucket:
+    key: str
+    capacity: int
+    per_minute: float
+
+
+class RateLimitService:
+    """Token-bucket admission control for expensive unauthenticated endpoints
+
+    Buckets live in Redis and are checked and charged atomically by a Lua
+    script. Keys rejected by Redis are remembered in-process until their
+    retry time, so callers hammering an exhausted bucket are turned away
+    without a Redis round trip.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.prefix = "rate_limit:"
+        self._script = None
+        self._blocked_until: dict[str, float] = {}
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+        self._script = self.redis.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def check(
+        self, action: str, client_ip: str | None, email: str | None = None
+    ) -> None:
+        """Take one token from the caller's buckets or raise a 429"""
+        config = settings.rate_limit
+        if not config.enabled:
+            return
+
+        buckets = []
+        if client_ip:
+            buckets.append(
+                _Bucket(
+                    f"{self.prefix}{action}:ip:{client_ip}",
+                    config.ip_burst,
+                    config.ip_per_minute,
+                )
+            )
+        if email:
+            buckets.append(
+                _Bucket(
+                    f"{self.prefix}{action}:email:{email.strip().lower()}",
+                    config.email_burst,
+                    config.email_per_minute,
+                )
+            )
+        if not buckets:
+            return
+
+        now = time.monotonic()
+        blocked_until = max(self._blocked_until.get(b.key, 0.0) for b in buckets)
+        if blocked_until > now:
+            self._reject(blocked_until - now)
+
+        if not self.redis:
+            await self._connect()
+        args = []
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.per_minute / 60000]
+        try:
+            waits = await self._script(keys=[b.key for b in buckets], args=args)
+        except Exception:
+            # Fail open: an unavailable Redis must not lock every user out
+            logger.exception("Rate limit check failed; admitting request")
+            return
+
+        longest_wait = 0.0
+        for bucket, wait_ms in zip(buckets, waits):
+            if wait_ms:
+                self._block(bucket.key, now + wait_ms / 1000)
+                longest_wait = max(longest_wait, wait_ms / 1000)
+        if longest_wait:
+            self._reject(longest_wait)
+
+    def _block(self, key: str, until: float) -> None:
+        if len(self._blocked_until) >= _MAX_LOCAL_BLOCKS:
+            now = time.monotonic()
+            self._blocked_until = {
+                k: v for k, v in self._blocked_until.items() if v > now
+            }
+            if len(self._blocked_until) >= _MAX_LOCAL_BLOCKS:
+                return
+        self._blocked_until[key] = until
+
+    @staticmethod
+    def _reject(retry_after: float) -> None:
+        raise TooManyRequestsException(
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+            self._script = None
+
+
+rate_limit_service = RateLimitService()
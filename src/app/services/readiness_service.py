@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional, Sequence
+from redis.asyncio import Redis
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.config import db_config
+from app.observability.redis import InstrumentedRedis
+from app.services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+# Results older than this many intervals mean the checker itself is stuck
+_STALE_INTERVALS = 3
+
+
+@dataclass
+class DependencyStatus:
+    ok: bool
+    latency_ms: float | None = None
+    error: str | None = None
+    checked_at: datetime | None = None
+
+
+@dataclass
+class Readiness:
+    status: Literal["ready", "not_ready"]
+    checks: dict[str, DependencyStatus]
+
+
+class ReadinessService:
+    """Dependency checks run in the background and served from cache
+
+    Probes only read the last results, so however often they arrive the
+    dependencies see one check per interval and worker. A check still
+    running from an earlier round is not started again.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self._results: dict[str, DependencyStatus] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._checked_at = 0.0
+        self._started = False
+        self._task: asyncio.Task | None = None
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def _check_database(self) -> None:
+        async with db_config.get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check_redis(self) -> None:
+        if not self.redis:
+            await self._connect()
+        await self.redis.ping()
+
+    def _checks(self) -> dict[str, Callable[[], Awaitable[None]]]:
+        checks = {"database": self._check_database, "redis": self._check_redis}
+        if settings.readiness.check_s3:
+            checks["s3"] = s3_service.head_bucket
+        return checks
+
+    async def _run_check(
+        self, name: str, check: Callable[[], Awaitable[None]]
+    ) -> DependencyStatus:
+        checked_at = datetime.now(timezone.utc)
+        running = self._running.get(name)
+        if running and not running.done():
+            return DependencyStatus(
+                ok=False, error="Previous check still running", checked_at=checked_at
+            )
+
+        task = self._running[name] = asyncio.create_task(check())
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(task), settings.readiness.check_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            return DependencyStatus(ok=False, error="Timed out", checked_at=checked_at)
+        except Exception as e:
+            return DependencyStatus(
+                ok=False, error=f"{type(e).__name__}: {e}", checked_at=checked_at
+            )
+        return DependencyStatus(
+            ok=True,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            checked_at=checked_at,
+        )
+
+    async def check_all(self) -> None:
+        """Run every check once and cache the results"""
+        checks = self._checks()
+        results = await asyncio.gather(
+            *(self._run_check(name, check) for name, check in checks.items())
+        )
+        for name, result in zip(checks, results):
+            previous = self._results.get(name)
+            if not result.ok and (previous is None or previous.ok):
+                logger.warning("Readiness check %s failed: %s", name, result.error)
+            self._results[name] = result
+        self._checked_at = time.monotonic()
+
+    def readiness(self) -> Readiness:
+        """Cached state; never touches the dependencies"""
+        fresh = (
+            time.monotonic() - self._checked_at
+            < _STALE_INTERVALS * settings.readiness.check_interval_seconds
+        )
+        ready = (
+            self._started
+            and fresh
+            and bool(self._results)
+            and all(result.ok for result in self._results.values())
+        )
+        return Readiness(
+            status="ready" if ready else "not_ready", checks=dict(self._results)
+        )
+
+    async def _prewarm(self, redis_services: Sequence) -> None:
+        """Open pool connections so the first requests don't pay for setup"""
+        config = settings.readiness
+        db_connections = min(config.prewarm_db_connections, settings.database.pool_size)
+
+        async def open_db_connection() -> None:
+            async with db_config.get_engine().connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        async def open_redis_connections(service) -> None:
+            if not service.redis:
+                await service._connect()
+            # Concurrent commands each check out their own pooled connection
+            await asyncio.gather(
+                *(service.redis.ping() for _ in range(config.prewarm_redis_connections))
+            )
+
+        results = await asyncio.gather(
+            *(open_db_connection() for _ in range(db_connections)),
+            *(open_redis_connections(service) for service in redis_services),
+            return_exceptions=True,
+        )
+        for error in {repr(r) for r in results if isinstance(r, BaseException)}:
+            logger.warning("Connection prewarming failed: %s", error)
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.readiness.check_interval_seconds)
+            try:
+                await self.check_all()
+            except Exception:
+                logger.exception("Readiness checks failed")
+
+    @asynccontextmanager
+    async def lifespan(self, redis_services: Sequence) -> AsyncIterator[None]:
+        """Prewarm connections and run the first checks before serving"""
+        timeout = settings.readiness.check_timeout_seconds
+        try:
+            await asyncio.wait_for(self._prewarm(redis_services), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Connection prewarming timed out after %.1fs", timeout)
+        # The first round of checks also connects to the S3 endpoint
+        await self.check_all()
+        self._started = True
+        self._task = asyncio.create_task(self._check_periodically())
+        try:
+            yield
+        finally:
+            self._task.cancel()
+            self._task = None
+            self._started = False
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+readiness_service = ReadinessService()
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.db.config import db_config
+from app.db.repositories.file import FileRepository
+from app.observability.redis import InstrumentedRedis
+from app.services.csv_utils import (
+    CsvChunkParser,
+    find_time_column,
+    to_epoch_seconds,
+    to_float_array,
+)
+from app.services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    # Row 0 holds epoch-second timestamps, row 1 the metric values, sorted by time
+    readings: np.ndarray
+    spill_path: Path | None = None
+    # User generation the readings were loaded at, see ReadingsCacheService
+    generation: str | None = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.readings.nbytes
+
+
+class ReadingsCache:
+    """Byte-budgeted LRU of contiguous reading arrays keyed by (user, metric)
+
+    Large entries can be spilled to memory-mapped files so they are paged in
+    by the OS on demand instead of counting against the memory budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        spill_dir: str | None = None,
+        spill_min_bytes: int = 0,
+        max_spill_bytes: int = 0,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_min_bytes = spill_min_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._user_keys: dict[str, set[tuple[str, str]]] = {}
+        self.resident_bytes = 0
+        self.spilled_bytes = 0
+
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(
+        self, user_id: str, metric: str, generation: str | None = None
+    ) -> np.ndarray | None:
+        entry = self._entries.get((user_id, metric))
+        if entry is None:
+            return None
+        if entry.generation != generation:
+            self._remove((user_id, metric))
+            return None
+        self._entries.move_to_end((user_id, metric))
+        return entry.readings
+
+    def put(
+        self,
+        user_id: str,
+        metric: str,
+        readings: np.ndarray,
+        generation: str | None = None,
+    ) -> None:
+        key = (user_id, metric)
+        self._remove(key)
+
+        readings = np.ascontiguousarray(readings, dtype=np.float64)
+        entry = _CacheEntry(readings=readings, generation=generation)
+        if self.spill_dir and readings.nbytes >= self.spill_min_bytes:
+            if readings.nbytes > self.max_spill_bytes:
+                return
+            self._evict(spilled=True, needed=readings.nbytes)
+            entry = self._spill(readings)
+            entry.generation = generation
+            self.spilled_bytes += entry.nbytes
+        else:
+            if readings.nbytes > self.max_bytes:
+                return
+            self._evict(spilled=False, needed=readings.nbytes)
+            self.resident_bytes += entry.nbytes
+
+        self._entries[key] = entry
+        self._user_keys.setdefault(user_id, set()).add(key)
+
+    def invalidate_user(self, user_id: str) -> None:
+        for key in self._user_keys.pop(user_id, set()):
+            self._remove(key)
+
+    def _spill(self, readings: np.ndarray) -> _CacheEntry:
+        path = self.spill_dir / f"{uuid.uuid4().hex}.npy"
+        np.save(path, readings)
+        return _CacheEntry(readings=np.load(path, mmap_mode="r"), spill_path=path)
+
+    def _evict(self, spilled: bool, needed: int) -> None:
+        """Evict least recently used entries of one kind until `needed` fits"""
+        budget = self.max_spill_bytes if spilled else self.max_bytes
+        for key in list(self._entries):
+            used = self.spilled_bytes if spilled else self.resident_bytes
+            if used + needed <= budget:
+                return
+            if (self._entries[key].spill_path is not None) == spilled:
+                self._remove(key)
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._user_keys.get(key[0], set()).discard(key)
+        if entry.spill_path is not None:
+            self.spilled_bytes -= entry.nbytes
+            del entry.readings
+            entry.spill_path.unlink(missing_ok=True)
+        else:
+            self.resident_bytes -= entry.nbytes
+
+
+class ReadingsCacheService:
+    """Serves recent-window reading queries from the in-process hot cache
+
+    On a miss the readings are loaded once from the user's files whose
+    time coverage reaches into the cache window. The cache is per worker,
+    so ingests bump a per-user generation in Redis: entries loaded at an
+    older generation are dropped on their next read in every worker, and a
+    load that raced with an ingest is not cached.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.generation_prefix = "readings_generation:"
+        config = settings.readings_cache
+        self.window = timedelta(hours=config.window_hours)
+        self.cache = ReadingsCache(
+            max_bytes=config.max_bytes,
+            spill_dir=config.spill_dir,
+            spill_min_bytes=config.spill_min_bytes,
+            max_spill_bytes=config.max_spill_bytes,
+        )
+        # One in-flight load per (user, metric, generation), shared by all
+        # callers that miss while it runs
+        self._loads: dict[tuple[str, str, str], asyncio.Task] = {}
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def _get_generation(self, user_id: str) -> str:
+        if not self.redis:
+            await self._connect()
+
+        key = f"{self.generation_prefix}{user_id}"
+        generation = await self.redis.get(key)
+        if generation is None:
+            # Seed from the clock so a lost counter never reuses an old value
+            await self.redis.set(key, time.time_ns(), nx=True)
+            generation = await self.redis.get(key)
+        return generation
+
+    async def get_readings(
+        self, user_id: str, metric: str, start: datetime, end: datetime
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps, values) for the metric within [start, end]"""
+        generation = await self._get_generation(user_id)
+        readings = self.cache.get(user_id, metric, generation)
+        if readings is None:
+            key = (user_id, metric, generation)
+            load = self._loads.get(key)
+            if load is None:
+                load = asyncio.create_task(self._load_and_cache(*key))
+                self._loads[key] = load
+                load.add_done_callback(lambda _: self._loads.pop(key, None))
+            # A cancelled caller must not cancel the load others wait for
+            readings = await asyncio.shield(load)
+
+        timestamps = readings[0]
+        lo = np.searchsorted(timestamps, start.timestamp(), side="left")
+        hi = np.searchsorted(timestamps, end.timestamp(), side="right")
+        return np.asarray(timestamps[lo:hi]), np.asarray(readings[1][lo:hi])
+
+    async def _load_and_cache(
+        self, user_id: str, metric: str, generation: str
+    ) -> np.ndarray:
+        readings = await self._load(user_id, metric)
+        # Data ingested during the load may be missing from it
+        if await self._get_generation(user_id) == generation:
+            self.cache.put(user_id, metric, readings, generation)
+        return readings
+
+    async def invalidate_user(self, user_id: uuid.UUID | str) -> None:
+        """Invalidate the user's cached readings in every worker"""
+        self.cache.invalidate_user(str(user_id))
+        if not self.redis:
+            await self._connect()
+
+        key = f"{self.generation_prefix}{user_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.incr(key)
+            await pipe.execute()
+
+    def window_start(self) -> datetime:
+        return datetime.now(timezone.utc) - self.window
+
+    async def _load(self, user_id: str, metric: str) -> np.ndarray:
+        since = self.window_start()
+        async with db_config.get_session() as session:
+            files = await FileRepository(session=session).get_user_files_covering(
+                session, user_id, since
+            )
+
+        parts = [
+            await self._read_metric(file.s3_key, metric, since.timestamp())
+            for file in files
+            if metric in (file.stats or {}).get("columns", {})
+        ]
+        if not parts:
+            return np.empty((2, 0))
+
+        readings = np.concatenate(parts, axis=1)
+        return readings[:, np.argsort(readings[0], kind="stable")]
+
+    async def _read_metric(self, s3_key: str, metric: str, since: float) -> np.ndarray:
+        parser = CsvChunkParser()
+        parts = []
+
+        def consume(data: bytes | None) -> None:
+            chunk = parser.feed(data) if data is not None else parser.close()
+            if chunk is None:
+                return
+            time_index = find_time_column(chunk.header)
+            if time_index is None or metric not in chunk.header:
+                return
+            timestamps = to_epoch_seconds(chunk.columns[time_index])
+            values = to_float_array(chunk.columns[chunk.header.index(metric)])
+            keep = np.isfinite(timestamps) & (timestamps >= since)
+            parts.append(np.vstack([timestamps[keep], values[keep]]))
+
+        async for data in s3_service.iter_object_chunks(s3_key):
+            await asyncio.to_thread(consume, data)
+        await asyncio.to_thread(consume, None)
+
+        return np.concatenate(parts, axis=1) if parts else np.empty((2, 0))
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+readings_cache_service = ReadingsCacheService()
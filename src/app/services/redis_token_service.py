@@ -6,6 +6,7 @@ from redis.asyncio import Redis
 from typing import Dict, Any, Optional
 
 from app.config import settings
+from app.observability.redis import InstrumentedRedis
 
 
 class RedisTokenService:
@@ -18,7 +19,9 @@ class RedisTokenService:
 
     async def _connect(self):
         """Initialize Redis connection"""
-        self.redis = Redis.from_url(str(settings.redis.url), decode_responses=True)
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
 
     async def create_refresh_token(
         self, user_id: UUID, expires_in_hours: int = 1
@@ -0,0 +1,185 @@
+"""Moves objects stored under an earlier key layout to the configured one
+
+uv run migrate-s3-keys [--batch-size 500] [--concurrency 16] [--delete-old]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.db.config import db_config
+from app.db.repositories.file import FileRepository
+from app.observability.redis import InstrumentedRedis
+from app.services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+# Refreshed after every batch; a crashed run frees the lock after this long
+_LOCK_TTL_SECONDS = 10 * 60
+# S3 DeleteObjects accepts at most 1000 keys
+_MAX_BATCH_SIZE = 1000
+
+
+class S3KeyMigrationService:
+    """Batched, resumable copy of objects to the current key layout
+
+    Files are scanned in ID order. Each batch copies its objects
+    concurrently, then updates their keys in one statement, then saves the
+    last file ID as the cursor in Redis, so an interrupted run continues
+    with the next batch. Objects are copied before any key changes and old
+    objects are only deleted afterwards, so every file stays readable while
+    the migration runs.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.cursor_key = "s3_key_migration:cursor"
+        self.lock_key = "s3_key_migration:lock"
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def reset(self) -> None:
+        """Forget the cursor so the next run scans every file again"""
+        if not self.redis:
+            await self._connect()
+        await self.redis.delete(self.cursor_key)
+
+    async def run(
+        self, batch_size: int = 500, concurrency: int = 16, delete_old: bool = False
+    ) -> tuple[int, int]:
+        """Migrate the remaining files; return the objects moved and failed"""
+        if not self.redis:
+            await self._connect()
+        if not await self.redis.set(self.lock_key, 1, nx=True, ex=_LOCK_TTL_SECONDS):
+            raise RuntimeError("Another S3 key migration is running")
+
+        batch_size = min(batch_size, _MAX_BATCH_SIZE)
+        semaphore = asyncio.Semaphore(concurrency)
+        moved = failed = 0
+
+        async def copy(old_key: str, new_key: str) -> None:
+            async with semaphore:
+                await s3_service.copy_object(old_key, new_key)
+
+        try:
+            cursor = await self.redis.get(self.cursor_key)
+            while True:
+                async with db_config.get_session() as session:
+                    rows = await FileRepository(session=session).get_completed_after(
+                        session, UUID(cursor) if cursor else None, batch_size
+                    )
+                if not rows:
+                    break
+
+                # Deduplicated files share an object; it is moved once
+                moves = {
+                    row.s3_key: s3_service.layout_key(row.s3_key)
+                    for row in rows
+                    if row.s3_key and s3_service.layout_key(row.s3_key) != row.s3_key
+                }
+                results = await asyncio.gather(
+                    *(copy(old, new) for old, new in moves.items()),
+                    return_exceptions=True,
+                )
+                copied = {}
+                for (old_key, new_key), result in zip(moves.items(), results):
+                    if isinstance(result, BaseException):
+                        logger.error("Failed to copy %s: %s", old_key, result)
+                        failed += 1
+                    else:
+                        copied[old_key] = new_key
+
+                async with db_config.get_session() as session:
+                    repo = FileRepository(session=session)
+                    await repo.replace_s3_keys(session, copied)
+                    await session.commit()
+                moved += len(copied)
+
+                if delete_old and copied:
+                    # Catch files that picked up an old key (deduplication)
+                    # while the batch was being copied. The update waits for
+                    # deduplications still in flight (they share-lock the file
+                    # they reuse); objects a row still references are kept.
+                    async with db_config.get_session() as session:
+                        repo = FileRepository(session=session)
+                        await repo.replace_s3_keys(session, copied)
+                        referenced = await repo.get_referenced_s3_keys(
+                            session, set(copied)
+                        )
+                        await session.commit()
+                    for old_key in sorted(referenced):
+                        logger.warning("Keeping %s, still referenced", old_key)
+                    unreferenced = [key for key in copied if key not in referenced]
+                    failed_deletes = (
+                        await s3_service.delete_files(unreferenced)
+                        if unreferenced
+                        else []
+                    )
+                    for old_key in failed_deletes:
+                        logger.error("Failed to delete migrated object %s", old_key)
+
+                cursor = str(rows[-1].id)
+                await self.redis.set(self.cursor_key, cursor)
+                await self.redis.expire(self.lock_key, _LOCK_TTL_SECONDS)
+                logger.info("Moved %d objects so far (cursor %s)", moved, cursor)
+
+            if not failed:
+                await self.redis.delete(self.cursor_key)
+            return moved, failed
+        finally:
+            await self.redis.delete(self.lock_key)
+
+    async def disconnect(self):
+        """Close Redis connection"""
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+s3_key_migration_service = S3KeyMigrationService()
+
+
+async def _migrate(args: argparse.Namespace) -> tuple[int, int]:
+    try:
+        if args.reset:
+            await s3_key_migration_service.reset()
+        return await s3_key_migration_service.run(
+            args.batch_size, args.concurrency, args.delete_old
+        )
+    finally:
+        await s3_key_migration_service.disconnect()
+        await db_config.get_engine().dispose()
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description=f"Move S3 objects to the '{settings.s3.key_layout}' key layout"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--delete-old", action="store_true", help="Delete objects once moved"
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Start over from the first file"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    moved, failed = asyncio.run(_migrate(args))
+    logger.info("Moved %d objects, %d failed", moved, failed)
+    if failed:
+        logger.warning("Run again with --reset to retry the failed objects")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
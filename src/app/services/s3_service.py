@@ -1,10 +1,14 @@
-from typing import BinaryIO
-from boto3 import client
+import asyncio
+import hashlib
+from typing import AsyncIterator, BinaryIO
 from botocore.exceptions import ClientError, NoCredentialsError
-from botocore.config import Config
 from litestar.exceptions import InternalServerException
 
 from app.config import settings
+from app.observability.s3 import instrument_s3_client
+
+# S3 requires every multipart part except the last to be at least 5 MiB
+_MULTIPART_PART_SIZE = 8 * 1024 * 1024
 
 
 class S3Service:
@@ -12,17 +16,44 @@ class S3Service:
         self.bucket_name = settings.s3.bucket_name
         self.aws_region = settings.aws.region
         self.presigned_url_expiry = settings.s3.presigned_url_expiry
+        # Created on first use; building a client takes a noticeable part of startup
+        self._s3_client = None
+        self._presign_client = None
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            s3_client = self._create_client(settings.s3.endpoint_url)
+            instrument_s3_client(s3_client)
+            self._s3_client = s3_client
+        return self._s3_client
+
+    @property
+    def presign_client(self):
+        # Presigned URLs are signed for the host clients will connect to
+        if not settings.s3.public_endpoint_url:
+            return self.s3_client
+        if self._presign_client is None:
+            self._presign_client = self._create_client(settings.s3.public_endpoint_url)
+        return self._presign_client
+
+    def _create_client(self, endpoint_url: str | None):
+        # boto3 and the client config load most of botocore; deferred to first use
+        from boto3 import client
+        from botocore.config import Config
 
         try:
-            self.s3_client = client(
+            return client(
                 "s3",
                 region_name=self.aws_region,
+                endpoint_url=endpoint_url,
                 aws_access_key_id=settings.aws.access_key_id,
                 aws_secret_access_key=settings.aws.secret_access_key,
                 config=Config(
                     signature_version="s3v4",
                     region_name=self.aws_region,
-                    s3={"addressing_style": "virtual"},
+                    # S3-compatible stores are usually addressed by path
+                    s3={"addressing_style": "path" if endpoint_url else "virtual"},
                 ),
             )
         except NoCredentialsError:
@@ -34,8 +65,27 @@ class S3Service:
         file_extension = ""
         if "." in original_filename:
             file_extension = original_filename.rsplit(".", 1)[1]
-            return f"users/{user_id}/{file_id}.{file_extension}"
-        return f"users/{user_id}/{file_id}"
+            return self.layout_key(f"users/{user_id}/{file_id}.{file_extension}")
+        return self.layout_key(f"users/{user_id}/{file_id}")
+
+    @staticmethod
+    def _key_hash(user_key: str) -> str:
+        digest = hashlib.sha256(user_key.encode()).hexdigest()
+        return digest[: settings.s3.key_hash_prefix_length]
+
+    def layout_key(self, s3_key: str) -> str:
+        """Key of an object under the configured layout, from a key in any layout"""
+        user_key = self.user_key(s3_key)
+        if settings.s3.key_layout == "hashed":
+            return f"{self._key_hash(user_key)}/{user_key}"
+        return user_key
+
+    def user_key(self, s3_key: str) -> str:
+        """Strip the hash prefix, if any"""
+        prefix, _, rest = s3_key.partition("/")
+        if rest.startswith("users/") and prefix == self._key_hash(rest):
+            return rest
+        return s3_key
 
     async def upload_file(
         self,
@@ -62,12 +112,103 @@ class S3Service:
         except ClientError as e:
             raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
 
+    async def head_bucket(self) -> None:
+        """Raise unless the bucket is reachable with the configured credentials"""
+        await asyncio.to_thread(self.s3_client.head_bucket, Bucket=self.bucket_name)
+
+    async def put_object(self, s3_key: str, data: bytes, content_type: str) -> None:
+        """Store a small in-memory object under an explicit key"""
+        try:
+            await asyncio.to_thread(
+                self.s3_client.put_object,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=data,
+                ContentType=content_type,
+                ServerSideEncryption="AES256",
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to upload object to S3: {str(e)}")
+
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        file_id: str,
+        user_id: str,
+        original_filename: str,
+        content_type: str,
+    ) -> tuple[str, int]:
+        """Upload a generated byte stream with a multipart upload
+
+        Memory use is bounded by the part size regardless of the stream
+        length. Returns the S3 key and the number of bytes written.
+        """
+        s3_key = self._generate_s3_key(file_id, user_id, original_filename)
+
+        try:
+            upload = await asyncio.to_thread(
+                self.s3_client.create_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ContentType=content_type,
+                ContentDisposition=f'attachment; filename="{original_filename}"',
+                ServerSideEncryption="AES256",
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
+
+        upload_id = upload["UploadId"]
+        parts = []
+        buffer = bytearray()
+        total_size = 0
+
+        async def flush_part() -> None:
+            part_number = len(parts) + 1
+            response = await asyncio.to_thread(
+                self.s3_client.upload_part,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer),
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                total_size += len(chunk)
+                if len(buffer) >= _MULTIPART_PART_SIZE:
+                    await flush_part()
+            if buffer or not parts:
+                await flush_part()
+
+            await asyncio.to_thread(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            return s3_key, total_size
+        except BaseException as e:
+            await asyncio.to_thread(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+            )
+            if isinstance(e, ClientError):
+                raise InternalServerException(f"Failed to upload file to S3: {str(e)}")
+            raise
+
     def generate_presigned_url(self, s3_key: str, expires_in: int | None = None) -> str:
         if expires_in is None:
             expires_in = self.presigned_url_expiry
 
         try:
-            url = self.s3_client.generate_presigned_url(
+            url = self.presign_client.generate_presigned_url(
                 "get_object",
                 Params={
                     "Bucket": self.bucket_name,
@@ -86,19 +227,30 @@ class S3Service:
         original_filename: str,
         content_type: str,
         expires_in: int = 3600,
+        content_length: int | None = None,
+        checksum_sha256: str | None = None,
     ) -> tuple[str, str]:
-        """Generate presigned URL for direct S3 upload"""
+        """Generate presigned URL for direct S3 upload
+
+        With `content_length`, the URL only accepts an object of exactly that size,
+        and with `checksum_sha256` (base64) only an object with that content.
+        """
         s3_key = self._generate_s3_key(file_id, user_id, original_filename)
+        params = {
+            "Bucket": self.bucket_name,
+            "Key": s3_key,
+            "ContentType": content_type,
+            "ContentDisposition": f'attachment; filename="{original_filename}"',
+        }
+        if content_length is not None:
+            params["ContentLength"] = content_length
+        if checksum_sha256 is not None:
+            params["ChecksumSHA256"] = checksum_sha256
 
         try:
-            url = self.s3_client.generate_presigned_url(
+            url = self.presign_client.generate_presigned_url(
                 "put_object",
-                Params={
-                    "Bucket": self.bucket_name,
-                    "Key": s3_key,
-                    "ContentType": content_type,
-                    "ContentDisposition": f'attachment; filename="{original_filename}"',
-                },
+                Params=params,
                 ExpiresIn=expires_in,
             )
             return url, s3_key
@@ -107,6 +259,78 @@ class S3Service:
                 f"Failed to generate presigned upload URL: {str(e)}"
             )
 
+    async def get_object_range(
+        self, s3_key: str, start: int, end: int
+    ) -> tuple[bytes, str | None, int | None]:
+        """Fetch bytes [start, end] of an object with a single ranged GET
+
+        Returns the data, the object's ETag and its total size.
+        """
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.get_object,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Range=f"bytes={start}-{end}",
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                # Ranged reads of an empty object are rejected by S3
+                return b"", None, 0
+            raise InternalServerException(f"Failed to read file from S3: {str(e)}")
+
+        data = await asyncio.to_thread(response["Body"].read)
+        etag = response.get("ETag", "").strip('"') or None
+        total_size = None
+        content_range = response.get("ContentRange")
+        if content_range and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            total_size = int(total) if total.isdigit() else None
+        return data, etag, total_size
+
+    async def iter_object_chunks(
+        self, s3_key: str, chunk_size: int = 1024 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Stream an object's body in chunks without loading it into memory"""
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.get_object, Bucket=self.bucket_name, Key=s3_key
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to read file from S3: {str(e)}")
+
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def copy_object(self, source_key: str, target_key: str) -> None:
+        """Server-side copy within the bucket; large objects are copied in parts"""
+        try:
+            head = await asyncio.to_thread(
+                self.s3_client.head_object, Bucket=self.bucket_name, Key=source_key
+            )
+            # Multipart copies don't carry headers over, so they are set explicitly
+            extra_args = {
+                "MetadataDirective": "REPLACE",
+                "ContentType": head.get("ContentType", "binary/octet-stream"),
+                "Metadata": head.get("Metadata", {}),
+                "ServerSideEncryption": "AES256",
+            }
+            if head.get("ContentDisposition"):
+                extra_args["ContentDisposition"] = head["ContentDisposition"]
+            await asyncio.to_thread(
+                self.s3_client.copy,
+                {"Bucket": self.bucket_name, "Key": source_key},
+                self.bucket_name,
+                target_key,
+                ExtraArgs=extra_args,
+            )
+        except ClientError as e:
+            raise InternalServerException(f"Failed to copy file in S3: {str(e)}")
+
     def delete_file(self, s3_key: str) -> bool:
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
@@ -114,5 +338,17 @@ class S3Service:
         except ClientError:
             return False
 
+    async def delete_files(self, s3_keys: list[str]) -> list[str]:
+        """Delete up to 1000 objects in one request and return the keys that failed"""
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.delete_objects,
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in s3_keys], "Quiet": True},
+            )
+        except ClientError:
+            return list(s3_keys)
+        return [error["Key"] for error in response.get("Errors", [])]
+
 
 s3_service = S3Service()
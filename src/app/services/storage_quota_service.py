@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+from uuid import UUID
+from litestar import Litestar
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.config import db_config
+from app.db.repositories.file import FileRepository
+from app.db.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class StorageQuotaService:
+    """Per-user quota checks against the incrementally maintained usage counters
+
+    Counters on the users row are adjusted in the same transaction that
+    completes or deletes a file, so checking a quota is a single-row read.
+    A periodic job recomputes them from the files table to repair drift.
+    Pending uploads hold a reservation of their declared size for a while,
+    so concurrent presigned uploads can't together exceed the quota.
+    """
+
+    def __init__(self):
+        self._reconcile_task: asyncio.Task | None = None
+
+    def exceeds_quota(
+        self, bytes_used: int, file_count: int, additional_bytes: int = 0
+    ) -> bool:
+        """Whether storing one more file of `additional_bytes` breaks the quota"""
+        quota = settings.storage_quota
+        return (
+            file_count + 1 > quota.max_files_per_user
+            or bytes_used + additional_bytes > quota.max_bytes_per_user
+        )
+
+    async def exceeds_quota_with_pending(
+        self, session: AsyncSession, user_id: UUID | str, additional_bytes: int = 0
+    ) -> bool:
+        """`exceeds_quota` counting the user's pending uploads as stored"""
+        usage = await UserRepository(session=session).get_storage_usage(
+            session, user_id
+        )
+        if not usage:
+            return False
+        since = datetime.utcnow() - timedelta(
+            seconds=settings.storage_quota.pending_reservation_seconds
+        )
+        pending_bytes, pending_count = await FileRepository(
+            session=session
+        ).get_pending_usage(session, str(user_id), since)
+        bytes_used, file_count = usage
+        return self.exceeds_quota(
+            bytes_used + pending_bytes, file_count + pending_count, additional_bytes
+        )
+
+    async def reconcile(self) -> int | None:
+        """Recompute all usage counters; None if another worker is doing it"""
+        async with db_config.get_session() as session:
+            repo = UserRepository(session=session)
+            return await repo.reconcile_storage_usage(session)
+
+    async def _reconcile_periodically(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                corrected = await self.reconcile()
+                if corrected:
+                    logger.warning("Corrected storage usage of %d users", corrected)
+            except Exception:
+                logger.exception("Storage usage reconciliation failed")
+
+    @asynccontextmanager
+    async def lifespan(self, app: Litestar) -> AsyncIterator[None]:
+        """Run the reconciliation job for the lifetime of the application"""
+        interval = settings.storage_quota.reconcile_interval_seconds
+        if interval > 0:
+            self._reconcile_task = asyncio.create_task(
+                self._reconcile_periodically(interval)
+            )
+        try:
+            yield
+        finally:
+            if self._reconcile_task:
+                self._reconcile_task.cancel()
+                self._reconcile_task = None
+
+
+storage_quota_service = StorageQuotaService()
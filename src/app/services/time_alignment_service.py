@@ -0,0 +1,343 @@
+import asyncio
+import csv
+import io
+import logging
+import math
+from datetime import datetime
+from pathlib import PurePath
+from typing import AsyncIterator, Awaitable, Iterable, Literal
+from uuid import UUID
+
+import numpy as np
+from litestar.exceptions import ClientException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.config import db_config
+from app.db.replicas import replica_router
+from app.db.models.file import FileModel, UploadStatus
+from app.db.repositories.user import UserRepository
+from app.services.csv_utils import (
+    CsvChunkParser,
+    find_time_column,
+    to_epoch_seconds,
+    to_float_array,
+)
+from app.services.file_listing_cache_service import file_listing_cache_service
+from app.services.file_processing_service import file_processing_service
+from app.services.s3_service import s3_service
+from app.services.storage_quota_service import storage_quota_service
+from app.services.upload_events_service import upload_events_service
+
+logger = logging.getLogger(__name__)
+
+AlignMethod = Literal["interpolate", "ffill"]
+
+# Grid points produced per batch; bounds memory together with the S3 chunk size
+_GRID_BATCH_SIZE = 10_000
+# Rows a cursor buffers before a batch is cut short; dense files then take
+# several batches instead of buffering the whole batch time span
+_MAX_BUFFERED_ROWS = 200_000
+
+
+class _SourceCursor:
+    """Buffered, forward-only view over the time-sorted rows of one CSV object"""
+
+    def __init__(self, s3_key: str, label: str):
+        self.label = label
+        self.columns: list[str] = []
+        self.times = np.empty(0)
+        self.values = np.empty((0, 0))
+        self.exhausted = False
+        self._chunks = s3_service.iter_object_chunks(s3_key)
+        self._parser = CsvChunkParser()
+        self._time_index: int | None = None
+        self._last_time = -math.inf
+        # Rows before this time are dropped as they are read
+        self._horizon = -math.inf
+
+    async def start(self) -> None:
+        """Read up to the first chunk so the header and start time are known"""
+        while not self.exhausted and not self.times.size:
+            await self._read_chunk()
+        if self._time_index is None or not self.times.size:
+            raise ClientException(f"No timestamped rows found in {self.label}")
+
+    async def fill_until(self, until: float) -> None:
+        """Read until a row at or after `until`, or until the buffer is full"""
+        while (
+            not self.exhausted
+            and (not self.times.size or self.times[-1] < until)
+            and self.times.size < _MAX_BUFFERED_ROWS
+        ):
+            await self._read_chunk()
+
+    async def _read_chunk(self) -> None:
+        data = await anext(self._chunks, None)
+        if data is None:
+            self.exhausted = True
+            chunk = self._parser.close()
+        else:
+            chunk = self._parser.feed(data)
+        if chunk is None:
+            return
+
+        if self._time_index is None:
+            self._time_index = find_time_column(chunk.header)
+            if self._time_index is None:
+                raise ClientException(f"No timestamp column found in {self.label}")
+            self.columns = [
+                name for i, name in enumerate(chunk.header) if i != self._time_index
+            ]
+            self.values = np.empty((0, len(self.columns)))
+
+        times, values = await asyncio.to_thread(self._convert, chunk.columns)
+        if times.size:
+            self._last_time = float(times[-1])
+        self.times = np.concatenate([self.times, times])
+        self.values = np.concatenate([self.values, values])
+        self._trim()
+
+    def _convert(self, columns: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        times = to_epoch_seconds(columns[self._time_index])
+        valid = np.isfinite(times)
+        times = times[valid]
+        # Rows are merged in file order; sorting per chunk would not order the file
+        if times.size and (times[0] < self._last_time or (np.diff(times) < 0).any()):
+            raise ClientException(f"Timestamps in {self.label} are not in order")
+        values = np.column_stack(
+            [
+                to_float_array(c)[valid]
+                for i, c in enumerate(columns)
+                if i != self._time_index
+            ]
+            or [np.empty((times.size, 0))]
+        )
+        return times, values
+
+    def sample(self, grid: np.ndarray, method: AlignMethod) -> np.ndarray:
+        """Resample every value column onto the grid timestamps"""
+        result = np.full((grid.size, len(self.columns)), np.nan)
+        if method == "ffill":
+            index = np.searchsorted(self.times, grid, side="right") - 1
+            has_sample = index >= 0
+            result[has_sample] = self.values[index[has_sample]]
+            return result
+
+        for j in range(len(self.columns)):
+            column = self.values[:, j]
+            valid = np.isfinite(column)
+            if valid.any():
+                result[:, j] = np.interp(
+                    grid, self.times[valid], column[valid], left=np.nan, right=np.nan
+                )
+        return result
+
+    def discard_before(self, until: float) -> None:
+        """Drop rows no longer needed, now and as they are read, keeping one
+        sample before `until`"""
+        self._horizon = until
+        self._trim()
+
+    def _trim(self) -> None:
+        keep_from = max(np.searchsorted(self.times, self._horizon, side="left") - 1, 0)
+        if keep_from:
+            self.times = self.times[keep_from:]
+            self.values = self.values[keep_from:]
+
+    async def close(self) -> None:
+        await self._chunks.aclose()
+
+
+async def _gather_all(coroutines: Iterable[Awaitable[None]]) -> None:
+    """Run the cursor reads concurrently and re-raise the first error
+
+    Every read finishes first: a cursor still reading can't be closed.
+    """
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _format_rows(grid: np.ndarray, blocks: list[np.ndarray]) -> bytes:
+    """Render a batch of aligned rows as CSV text"""
+    timestamps = np.datetime_as_string(
+        np.round(grid * 1000).astype(np.int64).astype("datetime64[ms]")
+    )
+    lines = timestamps.astype(object)
+    for block in blocks:
+        for j in range(block.shape[1]):
+            column = block[:, j]
+            # Shortest repr that round-trips float64
+            text = column.astype(str).astype(object)
+            text[~np.isfinite(column)] = ""
+            lines = lines + "," + text
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class TimeAlignmentService:
+    """Merges several sensor files onto a common time grid near the data"""
+
+    async def prepare(
+        self, files: list[FileModel], frequency_ms: int
+    ) -> list[_SourceCursor]:
+        """Open a cursor per file and validate that each has timestamped rows
+
+        Requests whose grid would exceed the configured number of points,
+        judging by the recorded time coverage of the files, are rejected.
+        """
+        labels = [PurePath(file.original_filename).stem for file in files]
+        cursors = [
+            _SourceCursor(
+                file.s3_key, label if labels.count(label) == 1 else f"{label}#{i}"
+            )
+            for i, (file, label) in enumerate(zip(files, labels))
+        ]
+        try:
+            await _gather_all(cursor.start() for cursor in cursors)
+            self._check_grid_size(files, cursors, frequency_ms)
+        except BaseException:
+            await asyncio.gather(*(cursor.close() for cursor in cursors))
+            raise
+        return cursors
+
+    def _check_grid_size(
+        self, files: list[FileModel], cursors: list[_SourceCursor], frequency_ms: int
+    ) -> None:
+        coverages = [(file.stats or {}).get("time_coverage") for file in files]
+        if not all(coverages):
+            # Not processed yet; iter_aligned_csv still stops at the limit
+            return
+        start = max(float(cursor.times[0]) for cursor in cursors)
+        end = min(
+            datetime.fromisoformat(coverage["end"]).timestamp()
+            for coverage in coverages
+        )
+        points = math.floor((end - start) * 1000 / frequency_ms) + 1
+        if points > settings.align.max_grid_points:
+            raise ClientException(
+                f"Aligning these files at {frequency_ms} ms gives {points} rows, "
+                f"more than the limit of {settings.align.max_grid_points}"
+            )
+
+    async def iter_aligned_csv(
+        self, cursors: list[_SourceCursor], frequency_ms: int, method: AlignMethod
+    ) -> AsyncIterator[bytes]:
+        """Stream the as-of joined, resampled rows as CSV in bounded batches
+
+        The grid starts at the latest first sample across files and stops
+        once any file runs out of data, or at the configured number of points.
+        """
+        step = frequency_ms / 1000.0
+        start = max(float(cursor.times[0]) for cursor in cursors)
+        max_points = settings.align.max_grid_points
+        header = io.StringIO()
+        csv.writer(header, lineterminator="\n").writerow(
+            ["timestamp"]
+            + [
+                f"{cursor.label}.{column}"
+                for cursor in cursors
+                for column in cursor.columns
+            ]
+        )
+
+        try:
+            yield header.getvalue().encode("utf-8")
+            offset = 0
+            while offset < max_points:
+                grid = start + step * np.arange(
+                    offset, min(offset + _GRID_BATCH_SIZE, max_points)
+                )
+                for cursor in cursors:
+                    cursor.discard_before(float(grid[0]))
+                await _gather_all(
+                    cursor.fill_until(float(grid[-1])) for cursor in cursors
+                )
+
+                # Only points every file has data up to can be sampled yet
+                grid = grid[grid <= min(float(c.times[-1]) for c in cursors)]
+                if not grid.size:
+                    break
+
+                blocks = [cursor.sample(grid, method) for cursor in cursors]
+                yield await asyncio.to_thread(_format_rows, grid, blocks)
+                offset += grid.size
+            else:
+                logger.warning("Aligned output stopped at %d rows", max_points)
+        finally:
+            await asyncio.gather(*(cursor.close() for cursor in cursors))
+
+    async def _fail_export(
+        self, session: AsyncSession, output_file: FileModel, user_id: str
+    ) -> None:
+        output_file.upload_status = UploadStatus.FAILED
+        await session.commit()
+        await replica_router.pin_primary(user_id)
+        await file_listing_cache_service.bump_version(user_id)
+        await upload_events_service.publish(
+            user_id,
+            "upload_status",
+            file_id=output_file.id,
+            status=UploadStatus.FAILED,
+        )
+
+    async def export_to_s3(
+        self,
+        output_file_id: UUID,
+        user_id: str,
+        cursors: list[_SourceCursor],
+        frequency_ms: int,
+        method: AlignMethod,
+    ) -> None:
+        """Write the aligned result to S3 and complete its pre-created file record"""
+        async with db_config.get_session() as session:
+            output_file = await session.get(FileModel, output_file_id)
+            try:
+                s3_key, file_size = await s3_service.upload_stream(
+                    self.iter_aligned_csv(cursors, frequency_ms, method),
+                    file_id=str(output_file_id),
+                    user_id=user_id,
+                    original_filename=output_file.original_filename,
+                    content_type=output_file.content_type,
+                )
+            except Exception:
+                logger.exception("Failed to export aligned file %s", output_file_id)
+                await self._fail_export(session, output_file, user_id)
+                return
+
+            # The size is only known now; the request was checked without it
+            usage = await UserRepository(session=session).get_storage_usage(
+                session, user_id
+            )
+            if usage and storage_quota_service.exceeds_quota(*usage, file_size):
+                logger.warning(
+                    "Aligned file %s exceeds the storage quota", output_file_id
+                )
+                if await s3_service.delete_files([s3_key]):
+                    logger.warning("Failed to delete over-quota export %s", s3_key)
+                await self._fail_export(session, output_file, user_id)
+                return
+
+            output_file.s3_key = s3_key
+            output_file.file_size = file_size
+            output_file.upload_date = datetime.utcnow()
+            output_file.upload_status = UploadStatus.COMPLETED
+            await UserRepository(session=session).adjust_storage_usage(
+                session, output_file.uploaded_by, bytes_delta=file_size, files_delta=1
+            )
+            await session.commit()
+
+        await replica_router.pin_primary(user_id)
+        await file_listing_cache_service.bump_version(user_id)
+        await upload_events_service.publish(
+            user_id,
+            "upload_status",
+            file_id=output_file_id,
+            status=UploadStatus.COMPLETED,
+            file_size=file_size,
+        )
+        await file_processing_service.process_file(output_file_id)
+
+
+time_alignment_service = TimeAlignmentService()
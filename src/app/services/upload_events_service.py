@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+from uuid import UUID
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.observability.redis import InstrumentedRedis
+
+logger = logging.getLogger(__name__)
+
+# Events kept per user for Last-Event-ID replay
+_STREAM_MAXLEN = 200
+_STREAM_TTL_SECONDS = 24 * 60 * 60
+_SUBSCRIBER_QUEUE_SIZE = 100
+_LISTENER_RETRY_SECONDS = 1.0
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+    )
+    # Set when the client fell too far behind; it must reconnect and replay
+    overflowed: bool = False
+
+
+def stream_id_key(event_id: str) -> tuple[int, int]:
+    """Sortable form of a Redis stream ID ("<ms>-<seq>")"""
+    millis, _, sequence = event_id.partition("-")
+    return int(millis), int(sequence or 0)
+
+
+class UploadEventsService:
+    """Per-user upload status events, fanned out to SSE clients per worker
+
+    Events are appended to a capped Redis stream per user (for replay via
+    Last-Event-ID) and published on a per-user channel. Each worker holds a
+    single pattern subscription and dispatches messages to the in-process
+    queues of its connected clients, so idle connections cost one small
+    queue each rather than a Redis connection.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.stream_prefix = "upload_events:"
+        self.channel_prefix = "upload_events_channel:"
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def _connect(self):
+        """Initialize Redis connection"""
+        self.redis = InstrumentedRedis.from_url(
+            str(settings.redis.url), decode_responses=True
+        )
+
+    async def publish(
+        self, user_id: UUID | str, event_type: str, **payload: object
+    ) -> None:
+        """Record an event for the user and notify connected clients"""
+        if not self.redis:
+            await self._connect()
+
+        data = json.dumps({"event": event_type, **payload}, default=str)
+        stream_key = f"{self.stream_prefix}{user_id}"
+        try:
+            event_id = await self.redis.xadd(
+                stream_key, {"data": data}, maxlen=_STREAM_MAXLEN, approximate=True
+            )
+            await self.redis.expire(stream_key, _STREAM_TTL_SECONDS)
+            await self.redis.publish(
+                f"{self.channel_prefix}{user_id}",
+                json.dumps({"id": event_id, "data": data}),
+            )
+        except Exception:
+            # Notifications are best effort; clients can always fall back to polling
+            logger.exception("Failed to publish upload event for user %s", user_id)
+
+    async def replay(
+        self, user_id: UUID | str, last_event_id: str
+    ) -> list[tuple[str, str]]:
+        """Events recorded after `last_event_id`, oldest first"""
+        if not self.redis:
+            await self._connect()
+
+        entries = await self.redis.xrange(
+            f"{self.stream_prefix}{user_id}", min=f"({last_event_id}", max="+"
+        )
+        return [(event_id, fields["data"]) for event_id, fields in entries]
+
+    async def subscribe(self, user_id: UUID | str) -> Subscription:
+        if not self.redis:
+            await self._connect()
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        subscription = Subscription()
+        self._subscriptions.setdefault(str(user_id), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id: UUID | str, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(str(user_id))
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[str(user_id)]
+
+    def _dispatch(self, user_id: str, message: str) -> None:
+        event = json.loads(message)
+        for subscription in self._subscriptions.get(user_id, ()):
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait((event["id"], event["data"]))
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    async def _listen(self) -> None:
+        """Worker-wide subscription loop, reconnecting on Redis errors"""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{self.channel_prefix}*")
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        user_id = message["channel"][len(self.channel_prefix) :]
+                        self._dispatch(user_id, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Upload event listener failed; reconnecting")
+                await asyncio.sleep(_LISTENER_RETRY_SECONDS)
+
+    async def disconnect(self):
+        """Stop the listener and close Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+
+upload_events_service = UploadEventsService()